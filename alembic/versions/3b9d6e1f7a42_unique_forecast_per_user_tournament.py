@@ -0,0 +1,52 @@
+"""Unique forecast per user and tournament
+
+Revision ID: 3b9d6e1f7a42
+Revises: f2c27d06c3bc
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# Under the "alembic" logger, which alembic.ini already prints at INFO
+log = logging.getLogger(f"alembic.runtime.migration.{__name__}")
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d6e1f7a42'
+down_revision: Union[str, Sequence[str], None] = 'f2c27d06c3bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Old delete + insert edits could leave duplicates behind. Each of them re-inserted
+    # the whole forecast, so the row with the highest id is the user's latest
+    # submission: keep it and drop the older copies (PostgreSQL-only DELETE ... USING)
+    dedupe = sa.text(
+        """
+        DELETE FROM forecasts f
+        USING forecasts newer
+        WHERE f.user_id = newer.user_id
+          AND f.tournament_id = newer.tournament_id
+          AND f.id < newer.id
+        """
+    )
+    if context.is_offline_mode():
+        op.execute(dedupe)
+    else:
+        deleted = op.get_bind().execute(dedupe).rowcount
+        log.info("Deleted %d duplicate forecast(s) before adding uq_forecasts_user_tournament", deleted)
+    op.create_unique_constraint(
+        'uq_forecasts_user_tournament', 'forecasts', ['user_id', 'tournament_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_forecasts_user_tournament', 'forecasts', type_='unique')
@@ -0,0 +1,40 @@
+"""Cascade tournament deletes to forecasts and participants
+
+Revision ID: 5e2b9f4c7a31
+Revises: d57a3c81b6e0
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9f4c7a31'
+down_revision: Union[str, Sequence[str], None] = 'd57a3c81b6e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Unnamed in the initial migration, so these are PostgreSQL's default names
+_FOREIGN_KEYS = (
+    ('forecasts_tournament_id_fkey', 'forecasts'),
+    ('tournament_participants_tournament_id_fkey', 'tournament_participants'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table in _FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(
+            name, table, 'tournaments', ['tournament_id'], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table in _FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'tournaments', ['tournament_id'], ['id'])
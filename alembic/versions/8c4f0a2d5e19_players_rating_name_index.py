@@ -0,0 +1,32 @@
+"""Index players by rating and name
+
+Revision ID: 8c4f0a2d5e19
+Revises: 3b9d6e1f7a42
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f0a2d5e19'
+down_revision: Union[str, Sequence[str], None] = '3b9d6e1f7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_players_rating_name',
+        'players',
+        [sa.text('current_rating DESC NULLS LAST'), 'full_name'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_rating_name', table_name='players')
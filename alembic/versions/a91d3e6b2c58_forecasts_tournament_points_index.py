@@ -0,0 +1,32 @@
+"""Index forecasts by tournament and points
+
+Revision ID: a91d3e6b2c58
+Revises: 5e2b9f4c7a31
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d3e6b2c58'
+down_revision: Union[str, Sequence[str], None] = '5e2b9f4c7a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_forecasts_tournament_points',
+        'forecasts',
+        ['tournament_id', sa.text('points_earned DESC NULLS LAST'), 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forecasts_tournament_points', table_name='forecasts')
@@ -0,0 +1,40 @@
+"""Replace the forecasts points index with the admin results one
+
+Revision ID: c3f8a5d1e7b4
+Revises: a91d3e6b2c58
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a5d1e7b4'
+down_revision: Union[str, Sequence[str], None] = 'a91d3e6b2c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The results table and the admin summary now share one order, so the older
+    # points index would only add write cost on every forecast
+    op.drop_index('ix_forecasts_tournament_points', table_name='forecasts')
+    op.create_index(
+        'ix_forecasts_tournament_results',
+        'forecasts',
+        ['tournament_id', sa.text('COALESCE(points_earned, 0) DESC'), 'created_at'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_forecasts_tournament_results', table_name='forecasts')
+    op.create_index(
+        'ix_forecasts_tournament_points',
+        'forecasts',
+        ['tournament_id', sa.text('points_earned DESC NULLS LAST'), 'id'],
+    )
@@ -0,0 +1,61 @@
+"""Case-insensitive unique player names
+
+Revision ID: d57a3c81b6e0
+Revises: 8c4f0a2d5e19
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# Under the "alembic" logger, which alembic.ini already prints at INFO
+log = logging.getLogger(f"alembic.runtime.migration.{__name__}")
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd57a3c81b6e0'
+down_revision: Union[str, Sequence[str], None] = '8c4f0a2d5e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Players that differ only in case can't be merged automatically: their IDs are
+    # stored in forecasts' prediction_data and tournaments' results JSON. Stop before
+    # creating the index and list them, so an admin can merge them and re-run
+    if not context.is_offline_mode():
+        clashes = op.get_bind().execute(
+            sa.text(
+                """
+                SELECT lower(full_name) AS name_key,
+                       string_agg(id || ': ' || full_name, ', ' ORDER BY id) AS players
+                FROM players
+                GROUP BY lower(full_name)
+                HAVING count(*) > 1
+                """
+            )
+        ).all()
+        if clashes:
+            for clash in clashes:
+                log.error("Players differing only in case: %s", clash.players)
+            raise RuntimeError(
+                f"{len(clashes)} player name(s) differ only in case; "
+                "merge or rename them before upgrading (see the log above)"
+            )
+
+    op.create_index(
+        'ix_players_full_name_lower',
+        'players',
+        [sa.text('lower(full_name)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_players_full_name_lower', table_name='players')
@@ -6,12 +6,16 @@ from pydantic import Field, field_validator
 class Settings(BaseSettings):
     bot_token: str
     database_url: str
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle_seconds: int = 1800
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_password: Optional[str] = None
     admin_ids: Union[List[int], str] = Field(default_factory=list)
     bug_report_chat_id: Optional[Union[int, str]] = None
     tg_api_server: Optional[str] = None
+    tg_connection_limit: int = 50
     tg_media_request_timeout: int = 180
     tg_media_max_attempts: int = 2
     tg_media_retry_backoff_seconds: float = 1.5
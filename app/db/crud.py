@@ -1,22 +1,58 @@
-from typing import Sequence, Optional, Iterable
-from sqlalchemy import select, delete
+from typing import Sequence, Optional, Iterable, Set
+from sqlalchemy import Row, bindparam, delete, exists, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import contains_eager, selectinload
 
-from app.db.models import Tournament, TournamentStatus, Player, Forecast, BugReport
+from app.db.models import (
+    Tournament,
+    TournamentStatus,
+    Player,
+    Forecast,
+    BugReport,
+    tournament_participants,
+)
 
-async def get_user_forecast_tournament_ids(session: AsyncSession, user_id: int) -> Sequence[int]:
-    """Returns a list of tournament IDs that the user has already predicted."""
+# Hot-path statements are built once at import and executed with bound parameters,
+# so each call reuses the same statement object and its compiled-SQL cache entry.
+_TOURNAMENT_WITH_PARTICIPANTS_STMT = (
+    select(Tournament)
+    .options(selectinload(Tournament.participants))
+    .where(Tournament.id == bindparam("tournament_id"))
+)
+
+_TOURNAMENT_PARTICIPANTS_STMT = (
+    select(Player)
+    .join(tournament_participants, tournament_participants.c.player_id == Player.id)
+    .where(tournament_participants.c.tournament_id == bindparam("tournament_id"))
+    .order_by(Player.current_rating.desc().nullslast(), Player.full_name)
+)
+
+_USER_FORECAST_STMT = select(Forecast).where(
+    Forecast.user_id == bindparam("user_id"),
+    Forecast.tournament_id == bindparam("tournament_id"),
+)
+
+_USER_FORECAST_ID_STMT = select(Forecast.id).where(
+    Forecast.user_id == bindparam("user_id"),
+    Forecast.tournament_id == bindparam("tournament_id"),
+)
+
+async def get_user_forecast_tournament_ids(session: AsyncSession, user_id: int) -> Set[int]:
+    """Returns the set of tournament IDs that the user has already predicted."""
     result = await session.execute(
         select(Forecast.tournament_id).where(Forecast.user_id == user_id)
     )
-    return result.scalars().all()
+    # Consumed straight into a set: callers only test membership
+    return set(result.scalars())
 
-async def get_open_tournaments(session: AsyncSession) -> Sequence[Tournament]:
+async def get_open_tournaments(session: AsyncSession, with_participants: bool = False) -> Sequence[Tournament]:
     """Returns all tournaments with OPEN status, ordered by date descending."""
-    result = await session.execute(
-        select(Tournament).where(Tournament.status == TournamentStatus.OPEN).order_by(Tournament.date.desc())
-    )
+    stmt = select(Tournament).where(Tournament.status == TournamentStatus.OPEN).order_by(Tournament.date.desc())
+    if with_participants:
+        # One extra IN (...) query covers the rosters of every listed tournament
+        stmt = stmt.options(selectinload(Tournament.participants))
+    result = await session.execute(stmt)
     return result.scalars().all()
 
 async def get_tournament(session: AsyncSession, tournament_id: int) -> Optional[Tournament]:
@@ -25,18 +61,127 @@ async def get_tournament(session: AsyncSession, tournament_id: int) -> Optional[
 
 async def get_tournament_with_participants(session: AsyncSession, tournament_id: int) -> Optional[Tournament]:
     """Returns a tournament with its participants loaded."""
-    return await session.get(
-        Tournament, 
-        tournament_id, 
-        options=[selectinload(Tournament.participants)]
+    result = await session.execute(
+        _TOURNAMENT_WITH_PARTICIPANTS_STMT, {"tournament_id": tournament_id}
     )
+    return result.scalar_one_or_none()
 
-async def get_forecast_for_editing(session: AsyncSession, forecast_id: int) -> Optional[Forecast]:
-    """Returns a forecast with tournament and its participants loaded (for editing validation)."""
-    return await session.get(
-        Forecast,
-        forecast_id,
-        options=[selectinload(Forecast.tournament).selectinload(Tournament.participants)],
+async def get_tournament_participants(session: AsyncSession, tournament_id: int) -> Sequence[Player]:
+    """Returns the participants of a tournament, rating desc then name, without loading the tournament row."""
+    result = await session.execute(
+        _TOURNAMENT_PARTICIPANTS_STMT, {"tournament_id": tournament_id}
+    )
+    return result.scalars().all()
+
+def active_participants_count(tournament_id: int):
+    """Scalar subquery counting the tournament's participants that are not archived."""
+    return (
+        select(func.count())
+        .select_from(tournament_participants)
+        .join(Player, Player.id == tournament_participants.c.player_id)
+        .where(
+            tournament_participants.c.tournament_id == tournament_id,
+            or_(Player.is_active.is_(True), Player.is_active.is_(None)),
+        )
+        .scalar_subquery()
+    )
+
+async def get_user_forecast(session: AsyncSession, user_id: int, tournament_id: int) -> Optional[Forecast]:
+    """Returns the user's forecast for a tournament, if any."""
+    result = await session.execute(
+        _USER_FORECAST_STMT, {"user_id": user_id, "tournament_id": tournament_id}
+    )
+    return result.scalar_one_or_none()
+
+async def user_has_forecast(session: AsyncSession, user_id: int, tournament_id: int) -> bool:
+    """Checks whether the user already has a forecast for a tournament."""
+    result = await session.execute(
+        _USER_FORECAST_ID_STMT, {"user_id": user_id, "tournament_id": tournament_id}
+    )
+    return result.scalar_one_or_none() is not None
+
+async def get_forecast_for_editing(session: AsyncSession, forecast_id: int, user_id: int) -> Optional[Forecast]:
+    """
+    Returns the user's forecast with tournament and its participants loaded (for editing validation).
+    The tournament comes in via JOIN, so this is two round trips instead of three;
+    forecasts owned by another user are not returned.
+    """
+    result = await session.execute(
+        select(Forecast)
+        .join(Forecast.tournament)
+        .options(contains_eager(Forecast.tournament).selectinload(Tournament.participants))
+        .where(Forecast.id == forecast_id, Forecast.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+def _addable_players_criteria(tournament_id: int):
+    """Active players who are not registered for the tournament yet."""
+    return (
+        or_(Player.is_active.is_(True), Player.is_active.is_(None)),
+        ~exists().where(
+            tournament_participants.c.tournament_id == tournament_id,
+            tournament_participants.c.player_id == Player.id,
+        ),
+    )
+
+async def get_addable_players_page(
+    session: AsyncSession, tournament_id: int, offset: int, limit: int
+) -> Sequence[Row]:
+    """
+    Returns one page of (id, full_name, current_rating, total) rows of players that can join the tournament.
+    total is the size of the whole filtered list, computed by a window over the same scan.
+    """
+    result = await session.execute(
+        select(
+            Player.id,
+            Player.full_name,
+            Player.current_rating,
+            func.count().over().label("total"),
+        )
+        .where(*_addable_players_criteria(tournament_id))
+        # Same order as the rosters and ix_players_rating_name: unrated players last
+        .order_by(Player.current_rating.desc().nullslast(), Player.full_name)
+        .offset(offset)
+        .limit(limit)
+    )
+    return result.all()
+
+async def count_addable_players(session: AsyncSession, tournament_id: int) -> int:
+    """Counts players that can join the tournament."""
+    return await session.scalar(
+        select(func.count())
+        .select_from(Player)
+        .where(*_addable_players_criteria(tournament_id))
+    )
+
+async def get_tournaments_page(
+    session: AsyncSession, statuses: Iterable[TournamentStatus], offset: int, limit: int
+) -> Sequence[Row]:
+    """
+    Returns one page of (id, name, date, status, total) rows of tournaments in the given statuses, newest first.
+    total is the size of the whole filtered list, computed by a window over the same scan.
+    """
+    result = await session.execute(
+        select(
+            Tournament.id,
+            Tournament.name,
+            Tournament.date,
+            Tournament.status,
+            func.count().over().label("total"),
+        )
+        .where(Tournament.status.in_(list(statuses)))
+        .order_by(Tournament.date.desc(), Tournament.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    return result.all()
+
+async def count_tournaments(session: AsyncSession, statuses: Iterable[TournamentStatus]) -> int:
+    """Counts tournaments in the given statuses."""
+    return await session.scalar(
+        select(func.count())
+        .select_from(Tournament)
+        .where(Tournament.status.in_(list(statuses)))
     )
 
 async def get_players_by_ids(session: AsyncSession, player_ids: Iterable[int]) -> Sequence[Player]:
@@ -53,6 +198,25 @@ async def delete_forecast(session: AsyncSession, forecast_id: int) -> None:
     """Deletes a forecast by ID."""
     await session.execute(delete(Forecast).where(Forecast.id == forecast_id))
 
+async def upsert_forecast(
+    session: AsyncSession, user_id: int, tournament_id: int, prediction_data: list
+) -> int:
+    """
+    Creates the user's forecast for a tournament or overwrites its picks if one exists.
+    Relies on the (user_id, tournament_id) unique constraint; returns the forecast ID.
+    """
+    stmt = (
+        pg_insert(Forecast)
+        .values(user_id=user_id, tournament_id=tournament_id, prediction_data=prediction_data)
+        .on_conflict_do_update(
+            index_elements=[Forecast.user_id, Forecast.tournament_id],
+            set_={"prediction_data": prediction_data},
+        )
+        .returning(Forecast.id)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one()
+
 async def get_tournament_with_forecasts(session: AsyncSession, tournament_id: int) -> Optional[Tournament]:
     """Returns a tournament with forecasts loaded."""
     return await session.get(
@@ -13,6 +13,10 @@ from sqlalchemy import (
     Table,
     Boolean,
     BigInteger, # Added
+    UniqueConstraint,
+    Index,
+    func,
+    text,
 )
 from sqlalchemy.orm import relationship, declarative_base
 
@@ -76,7 +80,12 @@ class User(Base):
 tournament_participants = Table(
     "tournament_participants",
     Base.metadata,
-    Column("tournament_id", Integer, ForeignKey("tournaments.id"), primary_key=True),
+    Column(
+        "tournament_id",
+        Integer,
+        ForeignKey("tournaments.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
     Column("player_id", Integer, ForeignKey("players.id"), primary_key=True),
 )
 
@@ -95,6 +104,18 @@ class Player(Base):
     )
 
 
+# Player names are unique regardless of case
+Index("ix_players_full_name_lower", func.lower(Player.full_name), unique=True)
+
+# Matches the participants ORDER BY so rosters come back pre-sorted.
+# NULLS LAST in an index is PostgreSQL-only; SQLite test databases skip it
+Index(
+    "ix_players_rating_name",
+    Player.current_rating.desc().nullslast(),
+    Player.full_name,
+).ddl_if(dialect="postgresql")
+
+
 class TournamentStatus(enum.Enum):
     DRAFT = "DRAFT"
     OPEN = "OPEN"
@@ -112,20 +133,40 @@ class Tournament(Base):
     prediction_count = Column(Integer, default=5)
     results = Column(JSON)  # {"player_id": rank}
 
-    forecasts = relationship("Forecast", back_populates="tournament")
+    # Rows go away with the tournament via ON DELETE CASCADE, not ORM-side deletes
+    forecasts = relationship(
+        "Forecast", back_populates="tournament", passive_deletes=True
+    )
     
     # Связь многие-ко-многим с игроками
+    # Loaded in display order (rating desc, then name), so callers don't re-sort
     participants = relationship(
-        "Player", secondary=tournament_participants, back_populates="tournaments"
+        "Player",
+        secondary=tournament_participants,
+        back_populates="tournaments",
+        order_by=(Player.current_rating.desc().nullslast(), Player.full_name),
     )
 
 
 class Forecast(Base):
     __tablename__ = "forecasts"
+    # One forecast per user and tournament; also the conflict target for upserts
+    __table_args__ = (
+        UniqueConstraint("user_id", "tournament_id", name="uq_forecasts_user_tournament"),
+        # Results table and admin summary: unscored as 0, points desc, earlier forecast first
+        Index(
+            "ix_forecasts_tournament_results",
+            "tournament_id",
+            text("COALESCE(points_earned, 0) DESC"),
+            "created_at",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False) # Changed to BigInteger
-    tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=False)
+    tournament_id = Column(
+        Integer, ForeignKey("tournaments.id", ondelete="CASCADE"), nullable=False
+    )
     prediction_data = Column(JSON, nullable=False)  # [player_id_1st, player_id_2nd, ...]
     points_earned = Column(Integer)
     created_at = Column(DateTime, default=utc_now)
@@ -1,10 +1,27 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.config import config
 from app.db.models import Base
 
 # Создаем асинхронный "движок" для нашей базы данных
 # echo=True будет выводить в консоль все SQL-запросы, полезно для отладки
-engine = create_async_engine(config.database_url, echo=False)
+# Пул рассчитан на пиковую нагрузку от админов; pre_ping отсекает соединения,
+# закрытые сервером, а recycle не дает им дожить до серверного таймаута
+# Размеры пула применимы только к QueuePool; SQLite (тесты, :memory:) берет свой пул
+_pool_kwargs = {}
+if make_url(config.database_url).get_backend_name() == "postgresql":
+    _pool_kwargs = {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+    }
+
+engine = create_async_engine(
+    config.database_url,
+    echo=False,
+    pool_pre_ping=True,
+    pool_recycle=config.db_pool_recycle_seconds,
+    **_pool_kwargs,
+)
 
 # Создаем фабрику сессий, через которую мы будем подключаться к БД
 async_session = async_sessionmaker(engine, expire_on_commit=False)
@@ -98,7 +98,6 @@ async def save_and_send_report(message_or_cb: types.Message | types.CallbackQuer
         )
         await crud.create_bug_report(session, report)
         await session.commit()
-        await session.refresh(report)
         report_id = report.id
 
     # Send success message to User
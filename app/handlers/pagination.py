@@ -1,8 +1,14 @@
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 
-from app.db.models import Player
-from app.keyboards.inline import get_paginated_players_kb
+from app.keyboards.inline import (
+    PlayerView,
+    add_participants_kb,
+    get_paginated_players_kb,
+    player_views,
+)
+from app.utils.participants_cache import get_participants
+from app.utils.player_pages import get_addable_players_page
 
 router = Router()
 
@@ -24,39 +30,53 @@ async def cq_paginate_players(callback: types.CallbackQuery, state: FSMContext):
         return
 
     data = await state.get_data()
+
+    if action in ("add_player", "add_player_multi") and data.get("managed_tournament_id"):
+        # The add-participant list is paged in SQL; only the multi-select picks live in state
+        tournament_id = data["managed_tournament_id"]
+        players, total, page = await get_addable_players_page(tournament_id, page)
+        checked_ids = None
+        if action == "add_player_multi":
+            checked_ids = set(data.get("bulk_selected_ids", []))
+            await state.update_data(bulk_page=page)
+        kb = add_participants_kb(players, tournament_id, page, total, checked_ids)
+        await callback.message.edit_reply_markup(reply_markup=kb)
+        return
     
-    # Player data can be stored in different keys depending on the context
-    # For tournament management, it's 'all_players'
-    # For prediction, it's 'tournament_players'
-    player_dict = data.get("all_players") or data.get("tournament_players") or {}
+    # Admin flows store the roster as parallel player_ids/player_names/player_ratings
+    # lists; 'all_players'/'tournament_players' dicts may linger in older sessions.
+    # The prediction flow stores only 'tournament_id' and reads the participants cache
+    player_data = data.get("all_players") or data.get("tournament_players") or {}
     
-    if not player_dict:
+    if 'predict' in action and data.get("tournament_id"):
+        # Checked first: an admin roster left in state by another flow must never
+        # page into the prediction keyboard. The roster lives in the cache
+        all_players = await get_participants(data["tournament_id"])
+    elif data.get("player_ids"):
+        all_players = player_views(data)
+    elif not player_data:
         # Cannot paginate without a list of players
         return
-
-    all_players = []
-    for pid, data_val in player_dict.items():
-        if isinstance(data_val, dict):
-            # New format: {'name': '...', 'rating': ...}
-            p = Player(
-                id=pid, 
-                full_name=data_val.get('name', 'Unknown'), 
-                current_rating=data_val.get('rating')
-            )
-        else:
-            # Old format: just string name
-            p = Player(id=pid, full_name=str(data_val))
-        all_players.append(p)
+    else:
+        all_players = []
+        for pid, data_val in player_data.items():
+            if isinstance(data_val, dict):
+                # Dict format: {'name': '...', 'rating': ...}
+                p = PlayerView(
+                    int(pid),
+                    data_val.get('name', 'Unknown'),
+                    data_val.get('rating'),
+                )
+            else:
+                # Old format: just string name
+                p = PlayerView(int(pid), str(data_val))
+            all_players.append(p)
 
     # Determine which players are already selected
     # This also depends on the context
     selected_ids = []
     if 'predict' in action:
         selected_ids = data.get("forecast_list", [])
-    elif 'add_player' in action:
-        # In this case, 'selected' means already a participant
-        participant_ids = data.get("participant_ids", [])
-        selected_ids = participant_ids
     elif 'remove_player' in action:
         # When removing, there are no 'selected' players to filter out from the list itself.
         # The list of participants IS the list of players to show.
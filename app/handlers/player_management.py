@@ -1,7 +1,7 @@
 from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from sqlalchemy import or_, select, update
+from sqlalchemy import func, or_, select, update
 
 from app.db.models import Player
 from app.db.session import async_session
@@ -17,6 +17,7 @@ from app.keyboards.inline import (
 )
 from app.states.player_management import PlayerManagement
 from app.states.tournament_management import TournamentManagement
+from app.utils.participants_cache import invalidate_participants
 
 router = Router()
 router.message.filter(IsAdmin())
@@ -179,8 +180,10 @@ async def cq_skip_rating(callback: types.CallbackQuery, state: FSMContext):
     name = data.get("new_player_name")
 
     async with async_session() as session:
-        # Check for duplicates
-        existing = await session.execute(select(Player).where(Player.full_name == name))
+        # Case-insensitive, like ix_players_full_name_lower which backs this lookup
+        existing = await session.execute(
+            select(Player).where(func.lower(Player.full_name) == func.lower(name))
+        )
         if existing.scalar_one_or_none():
             await callback.message.edit_text(
                 f"❌ Игрок с именем {name} уже существует!",
@@ -212,8 +215,10 @@ async def msg_add_player_rating(message: types.Message, state: FSMContext):
     name = data.get("new_player_name")
 
     async with async_session() as session:
-        # Check for duplicates
-        existing = await session.execute(select(Player).where(Player.full_name == name))
+        # Case-insensitive, like ix_players_full_name_lower which backs this lookup
+        existing = await session.execute(
+            select(Player).where(func.lower(Player.full_name) == func.lower(name))
+        )
         if existing.scalar_one_or_none():
             await message.answer(
                 f"❌ Игрок с именем {name} уже существует!",
@@ -256,9 +261,10 @@ async def msg_edit_name_process(message: types.Message, state: FSMContext):
         if player:
             player.full_name = new_name
             await session.commit()
+            # Cached rosters hold name, rating and status; any tournament may list the player
+            invalidate_participants()
             await message.answer(f"✅ Имя изменено на <b>{new_name}</b>.")
-            # Re-fetch to get fresh state
-            await session.refresh(player)
+            # Attributes stay loaded after commit (expire_on_commit=False)
             status = "Активен" if is_player_active(player) else "Архивирован"
             text = (
                 f"<b>👤 Игрок: {player.full_name}</b>\n"
@@ -300,9 +306,9 @@ async def msg_edit_rating_process(message: types.Message, state: FSMContext):
         if player:
             player.current_rating = new_rating
             await session.commit()
+            invalidate_participants()
             await message.answer(f"✅ Рейтинг обновлен: <b>{new_rating}</b>.")
 
-            await session.refresh(player)
             status = "Активен" if is_player_active(player) else "Архивирован"
             text = (
                 f"<b>👤 Игрок: {player.full_name}</b>\n"
@@ -327,6 +333,7 @@ async def cq_delete_player(callback: types.CallbackQuery, state: FSMContext):
         if player:
             player.is_active = False
             await session.commit()
+            invalidate_participants()
             await callback.answer(
                 "✅ Игрок архивирован (удален из списка выбора).", show_alert=True
             )
@@ -345,6 +352,7 @@ async def cq_restore_player(callback: types.CallbackQuery, state: FSMContext):
         if player:
             player.is_active = True
             await session.commit()
+            invalidate_participants()
             await callback.answer("✅ Игрок восстановлен!", show_alert=True)
             await show_player_details(callback, player_id)
         else:
@@ -2,20 +2,21 @@ from aiogram import Router, types, F
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from sqlalchemy import select
 from datetime import datetime # ADDED
 import pytz # ADDED
 
 from app.db import crud
-from app.db.models import Tournament, TournamentStatus, Player, Forecast, User
+from app.db.models import Tournament, TournamentStatus, User
 from app.db.session import async_session
 from app.states.user_states import MakeForecast
 from app.config import config
-from app.utils.formatting import format_user_name
+from app.utils.formatting import PLACE_MEDALS, format_user_name
 from app.lexicon.ru import LEXICON_RU
 from app.handlers.view_helpers import show_forecast_card
+from app.utils.participants_cache import get_participants, remember_participants
+from app.utils.recipients_cache import invalidate_forecasters
 from app.keyboards.inline import (
-    get_paginated_players_kb, 
+    get_paginated_players_kb,
     confirmation_kb, 
     tournament_user_menu_kb,
     tournament_selection_kb,
@@ -36,11 +37,20 @@ async def get_open_tournaments(user_id: int):
         # Get IDs of tournaments the user has already made a forecast for
         predicted_tournament_ids = await crud.get_user_forecast_tournament_ids(session, user_id)
 
-        # Get all OPEN tournaments
-        open_tournaments = await crud.get_open_tournaments(session)
+        # Get all OPEN tournaments, warming the participants cache for the likely next click
+        open_tournaments = await crud.get_open_tournaments(session, with_participants=True)
+        for tournament in open_tournaments:
+            remember_participants(tournament.id, tournament.participants)
         
         return open_tournaments, predicted_tournament_ids
 
+async def _reply(message: types.Message | types.CallbackQuery, text: str, **kwargs):
+    """Answers a message, or edits the callback's message in place."""
+    if isinstance(message, types.CallbackQuery):
+        await message.message.edit_text(text, **kwargs)
+    else:
+        await message.answer(text, **kwargs)
+
 @router.message(F.text == "🏁 Актуальные турниры")
 @router.message(Command("predict"))
 async def cmd_predict_start(message: types.Message | types.CallbackQuery, state: FSMContext):
@@ -49,20 +59,23 @@ async def cmd_predict_start(message: types.Message | types.CallbackQuery, state:
     available_tournaments, predicted_ids = await get_open_tournaments(user_id)
 
     if not available_tournaments:
-         text = LEXICON_RU["no_open_tournaments"]
-         if isinstance(message, types.Message):
-             await message.answer(text)
-         else:
-             await message.message.edit_text(text)
+         await _reply(message, LEXICON_RU["no_open_tournaments"])
          return
 
     await state.set_state(MakeForecast.choosing_tournament)
+    # Display fields for the tournament menu, so it can render without re-reading the row
+    await state.update_data(
+        tournament_index={
+            str(t.id): {"name": t.name, "date": t.date.isoformat()}
+            for t in available_tournaments
+        }
+    )
     
-    text = "Выберите турнир (✅ - прогноз сделан):"
-    if isinstance(message, types.Message):
-        await message.answer(text, reply_markup=tournament_selection_kb(available_tournaments, predicted_ids))
-    else:
-        await message.message.edit_text(text, reply_markup=tournament_selection_kb(available_tournaments, predicted_ids))
+    await _reply(
+        message,
+        "Выберите турнир (✅ - прогноз сделан):",
+        reply_markup=tournament_selection_kb(available_tournaments, predicted_ids),
+    )
 
 @router.callback_query(F.data == "predict_back_to_list")
 async def cq_predict_back_to_list(callback: types.CallbackQuery, state: FSMContext):
@@ -72,6 +85,8 @@ async def cq_predict_back_to_list(callback: types.CallbackQuery, state: FSMConte
 async def show_tournament_menu_logic(callback: types.CallbackQuery, state: FSMContext, tournament_id: int):
     """Helper to show tournament menu, shared by multiple handlers."""
     async with async_session() as session:
+        # Always the live row, not the listed tournament_index: the tournament may have
+        # been closed or deleted since the list was shown
         tournament = await crud.get_tournament(session, tournament_id)
         if not tournament:
             await callback.answer(LEXICON_RU["tournament_not_found"], show_alert=True)
@@ -79,29 +94,26 @@ async def show_tournament_menu_logic(callback: types.CallbackQuery, state: FSMCo
             return
 
         # Check if user has forecast for this tournament
-        forecast_stmt = select(Forecast).where(Forecast.user_id == callback.from_user.id, Forecast.tournament_id == tournament_id)
-        forecast_res = await session.execute(forecast_stmt)
-        forecast = forecast_res.scalar_one_or_none()
+        forecast = await crud.get_user_forecast(session, callback.from_user.id, tournament_id)
 
         if forecast:
             # SHOW FORECAST CARD DIRECTLY
             await show_forecast_card(callback, tournament, forecast, session)
+        elif tournament.status != TournamentStatus.OPEN:
+            # No forecast and bets are closed: nothing to show, back to the open list
+            await callback.answer(LEXICON_RU["predictions_closed"], show_alert=True)
+            await cmd_predict_start(callback, state)
+            return
         else:
             # SHOW PARTICIPANTS LIST + MAKE FORECAST BUTTON
-            # Need to fetch participants. Since tournament object is already in session, 
-            # we use refresh to load the relationship explicitly.
-            await session.refresh(tournament, ["participants"])
+            participants = await get_participants(tournament_id)
             
             text = LEXICON_RU["participants_title"].format(name=tournament.name)
-            if not tournament.participants:
+            if not participants:
                 text += LEXICON_RU["no_participants"]
             else:
-                sorted_participants = sorted(
-                    tournament.participants, 
-                    key=lambda p: (-(p.current_rating or 0), p.full_name)
-                )
                 lines = []
-                for p in sorted_participants:
+                for p in participants:
                     rating_str = f"[{p.current_rating}] " if p.current_rating is not None else ""
                     lines.append(f"• {rating_str}{p.full_name}")
                 text += "\n".join(lines)
@@ -123,23 +135,25 @@ async def cq_view_participants(callback: types.CallbackQuery, state: FSMContext)
     """Shows the list of participants for the selected tournament."""
     tournament_id = int(callback.data.split("_")[2])
     
-    async with async_session() as session:
-        tournament = await crud.get_tournament_with_participants(session, tournament_id)
-        
-        text = LEXICON_RU["participants_title"].format(name=tournament.name)
-        if not tournament.participants:
-            text += LEXICON_RU["no_participants"]
-        else:
-            # Sort by rating (desc) then name
-            sorted_participants = sorted(
-                tournament.participants, 
-                key=lambda p: (-(p.current_rating or 0), p.full_name)
-            )
-            lines = []
-            for p in sorted_participants:
-                rating_str = f" ({p.current_rating})" if p.current_rating is not None else ""
-                lines.append(f"• {p.full_name}{rating_str}")
-            text += "\n".join(lines)
+    data = await state.get_data()
+    cached = data.get("tournament_index", {}).get(str(tournament_id))
+    if cached:
+        tournament_name = cached["name"]
+    else:
+        async with async_session() as session:
+            tournament = await crud.get_tournament(session, tournament_id)
+            tournament_name = tournament.name
+    # Already ordered by rating (desc) then name
+    participants = await get_participants(tournament_id)
+    
+    if not participants:
+        body = LEXICON_RU["no_participants"]
+    else:
+        body = "\n".join(
+            f"• {p.full_name} ({p.current_rating})" if p.current_rating is not None else f"• {p.full_name}"
+            for p in participants
+        )
+    text = LEXICON_RU["participants_title"].format(name=tournament_name) + body
     
     builder = InlineKeyboardBuilder()
     builder.button(text=LEXICON_RU["back_button"], callback_data=f"select_tournament_{tournament_id}")
@@ -153,8 +167,7 @@ async def cq_predict_start(callback: types.CallbackQuery, state: FSMContext):
     
     async with async_session() as session:
         # Double check if user already has a forecast (in case of race condition or old button)
-        forecast_res = await session.execute(select(Forecast).where(Forecast.user_id == callback.from_user.id, Forecast.tournament_id == tournament_id))
-        if forecast_res.scalar_one_or_none():
+        if await crud.user_has_forecast(session, callback.from_user.id, tournament_id):
              # Redirect to view/edit forecast
              # We can trigger the view_forecast handler logic here, or just send a message
              # Let's show a simple alert and refresh the menu to "My Forecast" state
@@ -163,21 +176,21 @@ async def cq_predict_start(callback: types.CallbackQuery, state: FSMContext):
              await show_tournament_menu_logic(callback, state, tournament_id)
              return
 
-        tournament = await crud.get_tournament_with_participants(session, tournament_id)
-        if not tournament or not tournament.participants:
+        tournament = await crud.get_tournament(session, tournament_id)
+        if tournament is None or tournament.status != TournamentStatus.OPEN:
+            # Stale button from a list shown before the tournament was closed or deleted
+            await callback.answer(LEXICON_RU["predictions_closed"], show_alert=True)
+            return
+        players = await get_participants(tournament_id)
+        if not players:
             await callback.answer(LEXICON_RU["no_participants_forecast_impossible"], show_alert=True)
             return
         
-        players = tournament.participants
         prediction_count = tournament.prediction_count or 5
 
     await state.set_state(MakeForecast.making_prediction)
     await state.update_data(
         tournament_id=tournament_id,
-        tournament_players={
-            p.id: {"name": p.full_name, "rating": p.current_rating}
-            for p in players
-        },
         forecast_list=[],
         prediction_count=prediction_count
     )
@@ -249,7 +262,7 @@ async def cq_edit_forecast_decision(callback: types.CallbackQuery, state: FSMCon
 async def cq_edit_forecast_confirm_yes_logic(callback: types.CallbackQuery, state: FSMContext, forecast_id: int):
     """Logic for starting edit when confirmed."""
     async with async_session() as session:
-        forecast = await crud.get_forecast_for_editing(session, forecast_id)
+        forecast = await crud.get_forecast_for_editing(session, forecast_id, callback.from_user.id)
         if not forecast or not forecast.tournament:
             await callback.answer(LEXICON_RU["tournament_not_found_for_forecast"], show_alert=True)
             return
@@ -265,14 +278,11 @@ async def cq_edit_forecast_confirm_yes_logic(callback: types.CallbackQuery, stat
             return
         
         prediction_count = tournament.prediction_count or 5
+        remember_participants(tournament.id, tournament.participants)
 
     await state.set_state(MakeForecast.making_prediction)
     await state.update_data(
         tournament_id=tournament.id,
-        tournament_players={
-            p.id: {"name": p.full_name, "rating": p.current_rating}
-            for p in tournament.participants
-        },
         forecast_list=[],
         editing_forecast_id=forecast_id,
         prediction_count=prediction_count
@@ -291,31 +301,31 @@ async def cq_process_prediction_selection(callback: types.CallbackQuery, state:
     player_id = int(callback.data.split(":")[1])
     
     data = await state.get_data()
-    players_dict = data.get("tournament_players", {})
+    players = await get_participants(data.get("tournament_id"))
     forecast_list = data.get("forecast_list", [])
     prediction_count = data.get("prediction_count", 5)
+    # The list keeps the pick order, the set answers membership checks
+    selected_ids = set(forecast_list)
 
-    if player_id in forecast_list:
+    if player_id in selected_ids:
         await callback.answer(LEXICON_RU["player_already_selected"], show_alert=True)
         return
 
     forecast_list.append(player_id)
-    await state.update_data(forecast_list=forecast_list)
+    selected_ids.add(player_id)
+    # `data` is already loaded, so write it back directly: update_data would read it again
+    data["forecast_list"] = forecast_list
+    await state.set_data(data)
     
     next_place = len(forecast_list) + 1
 
     if next_place <= prediction_count:
         # Ask for the next place
-        # Fetch players with ratings from DB for correct sorting
         tournament_id = data.get("tournament_id")
-        async with async_session() as session:
-             tournament = await crud.get_tournament_with_participants(session, tournament_id)
-             players = tournament.participants
-
         kb = get_paginated_players_kb(
             players=players,
             action="predict",
-            selected_ids=forecast_list,
+            selected_ids=selected_ids,
             tournament_id=tournament_id,
             show_back_to_menu=True
         )
@@ -326,17 +336,17 @@ async def cq_process_prediction_selection(callback: types.CallbackQuery, state:
     else:
         await state.set_state(MakeForecast.confirming_forecast)
         
-        final_forecast_text = LEXICON_RU["final_forecast_header"]
+        players_map = {p.id: p for p in players}
+        parts = [LEXICON_RU["final_forecast_header"]]
         for i, pid in enumerate(forecast_list):
-            p_data = players_dict.get(pid) or players_dict.get(str(pid))
-            if p_data:
-                p_name = p_data['name']
-                p_rating = p_data.get('rating')
-                display_name = f"{p_name} ({p_rating})" if p_rating is not None else p_name
+            p = players_map.get(pid)
+            if p:
+                display_name = f"{p.full_name} ({p.current_rating})" if p.current_rating is not None else p.full_name
             else:
                 display_name = LEXICON_RU['unknown_player']
-            final_forecast_text += f"{i+1}. {display_name}\n"
-        final_forecast_text += LEXICON_RU["confirm_choice"]
+            parts.append(f"{i+1}. {display_name}\n")
+        parts.append(LEXICON_RU["confirm_choice"])
+        final_forecast_text = "".join(parts)
 
         await callback.message.edit_text(
             final_forecast_text,
@@ -359,17 +369,14 @@ async def cq_predict_confirm(callback: types.CallbackQuery, state: FSMContext):
     editing_forecast_id = data.get("editing_forecast_id")
     tournament_id = data.get("tournament_id")
     forecast_list = data.get("forecast_list")
-    players_dict = data.get("tournament_players", {}) # Contains names with ratings now
-
-    new_forecast = Forecast(
-        user_id=callback.from_user.id,
-        tournament_id=tournament_id,
-        prediction_data=forecast_list,
-    )
+    players_map = {p.id: p for p in await get_participants(tournament_id)}
 
     async with async_session() as session:
-        if editing_forecast_id:
-            await crud.delete_forecast(session, editing_forecast_id)
+        # Single INSERT ... ON CONFLICT: creates the forecast or overwrites the picks of
+        # the existing one, so a double submit can't produce two rows
+        forecast_id = await crud.upsert_forecast(
+            session, callback.from_user.id, tournament_id, forecast_list
+        )
         
         # Streak logic
         user = await session.get(User, callback.from_user.id)
@@ -391,26 +398,25 @@ async def cq_predict_confirm(callback: types.CallbackQuery, state: FSMContext):
             user.last_forecast_date = today_date_in_tbilisi # Update with Tbilisi date
             session.add(user) # Mark for update
 
-        await crud.create_forecast(session, new_forecast)
         await session.commit()
-        await session.refresh(new_forecast) # Get ID
+        if not editing_forecast_id:
+            # A new forecaster must be in this tournament's next broadcast
+            invalidate_forecasters(tournament_id)
         
         # Construct success message
         text_header = LEXICON_RU["forecast_updated"] if editing_forecast_id else LEXICON_RU["forecast_accepted"]
-        text_body = LEXICON_RU["your_choice"]
+        body_parts = [LEXICON_RU["your_choice"]]
         
-        medals = {0: "🥇", 1: "🥈", 2: "🥉"}
         for i, pid in enumerate(forecast_list):
-            place = medals.get(i, f" {i+1}.")
-            p_data = players_dict.get(pid) or players_dict.get(str(pid))
-            if p_data:
-                p_name = p_data['name']
-                p_rating = p_data.get('rating')
-                player_name = f"{p_name} ({p_rating})" if p_rating is not None else p_name
+            place = PLACE_MEDALS[i] if i < 3 else f" {i+1}."
+            p = players_map.get(pid)
+            if p:
+                player_name = f"{p.full_name} ({p.current_rating})" if p.current_rating is not None else p.full_name
             else:
                 player_name = LEXICON_RU["unknown_player"]
             
-            text_body += f"{place} {player_name}\n"
+            body_parts.append(f"{place} {player_name}\n")
+        text_body = "".join(body_parts)
             
         # Show buttons to manage this forecast immediately
         # User just made a forecast, so status is likely OPEN.
@@ -428,7 +434,7 @@ async def cq_predict_confirm(callback: types.CallbackQuery, state: FSMContext):
             text_header + text_body,
             reply_markup=view_forecast_kb(
                 back_callback="predict_back_to_list",
-                forecast_id=new_forecast.id,
+                forecast_id=forecast_id,
                 tournament_id=tournament_id,
                 allow_edit=True,
                 show_others=is_admin,
@@ -674,21 +680,18 @@ async def cq_view_participants_from_forecast(callback: types.CallbackQuery, stat
          source = f"{parts[2]}_{parts[3]}_{parts[4]}"
 
     async with async_session() as session:
-        tournament = await crud.get_tournament_with_participants(session, tournament_id)
+        tournament = await crud.get_tournament(session, tournament_id)
         if not tournament:
             await callback.answer(LEXICON_RU["tournament_not_found"], show_alert=True)
             return
+        participants = await crud.get_tournament_participants(session, tournament_id)
         
         text = LEXICON_RU["participants_title"].format(name=tournament.name)
-        if not tournament.participants:
+        if not participants:
             text += LEXICON_RU["no_participants"]
         else:
-            sorted_participants = sorted(
-                tournament.participants, 
-                key=lambda p: (-(p.current_rating or 0), p.full_name)
-            )
             lines = []
-            for p in sorted_participants:
+            for p in participants:
                 rating_str = f" ({p.current_rating})" if p.current_rating is not None else ""
                 lines.append(f"• {p.full_name}{rating_str}")
             text += "\n".join(lines)
@@ -1,7 +1,7 @@
 import html
 from collections.abc import Container, Mapping, Sequence
 
-from app.utils.formatting import get_medal_str
+from app.utils.formatting import PLACE_MEDALS, get_medal_str
 
 
 def build_forecast_card_text(
@@ -20,9 +20,8 @@ def build_forecast_card_text(
         f"от {tournament_date_str}:</b>\n\n"
     )
 
-    medals = {0: "🥇", 1: "🥈", 2: "🥉"}
     for i, player_id in enumerate(player_ids):
-        place = medals.get(i, f" {i + 1}.")
+        place = PLACE_MEDALS[i] if i < 3 else f" {i + 1}."
         player = players_map.get(player_id)
         if player:
             player_name = getattr(player, "full_name", "Неизвестный игрок")
@@ -104,3 +103,27 @@ def build_history_details_text(
         + prediction_text
         + f"\n<b>💰 Итого очков:</b> {points_earned or 0}"
     )
+
+
+def build_scored_prediction_text(
+    pred_ids: Sequence[int],
+    results: Mapping[int, int],
+    player_name_map: Mapping[int, str],
+) -> str:
+    lines = ["<b>📜 Ваш прогноз:</b>\n"]
+    exact_hits = 0
+    for i, player_id in enumerate(pred_ids):
+        player_name = player_name_map.get(player_id, "Неизвестный")
+        actual_rank = results.get(player_id)
+        if actual_rank is None:
+            line_points, extra_info = 0, " (не в топе)"
+        elif actual_rank == i + 1:
+            exact_hits += 1
+            line_points, extra_info = 5, " (🎯 Точно!)"
+        else:
+            line_points, extra_info = 1, f" (факт: {actual_rank})"
+        lines.append(f"{i + 1}. {player_name}{extra_info} — <b>+{line_points}</b>\n")
+
+    if pred_ids and exact_hits == len(pred_ids):
+        lines.append("\n🎉 <b>БОНУС: +15 очков за идеальный прогноз!</b>\n")
+    return "".join(lines)
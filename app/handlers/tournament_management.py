@@ -2,16 +2,29 @@ from aiogram import Bot, Router, types, F
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from sqlalchemy import select, func, delete, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, case, delete, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
 import datetime
+import functools
 import html
 import logging
+import math
 
 from app.filters.is_admin import IsAdmin
-from app.db.models import Tournament, Player, TournamentStatus, Forecast, User
+from app.db.models import (
+    Tournament,
+    Player,
+    TournamentStatus,
+    Forecast,
+    User,
+    tournament_participants,
+)
+from app.db import crud
 from app.db.session import async_session
 from app.states.tournament_management import TournamentManagement, SetResults
 from app.keyboards.inline import (
@@ -19,15 +32,34 @@ from app.keyboards.inline import (
     confirmation_kb,
     cancel_fsm_kb,
     admin_menu_kb,
+    TOURNAMENTS_PAGE_SIZE,
     get_paginated_tournaments_kb,
     enter_rating_fsm_kb,
     new_player_rating_kb,
+    add_participants_kb,
     add_player_success_kb,
     is_player_active,
+    player_columns,
+    player_views,
 )
 from app.core.scoring import calculate_forecast_points, calculate_new_stats
-from app.utils.formatting import format_player_list, get_medal_str, format_user_name
-from app.utils.broadcaster import broadcast_message
+from app.handlers.render_helpers import build_scored_prediction_text
+from app.utils.formatting import (
+    format_date,
+    format_player_list,
+    format_user_name,
+    get_medal_str,
+)
+from app.utils.broadcaster import (
+    BACKGROUND_TIMEOUT_SECONDS,
+    broadcast_message,
+    send_message_safe,
+    spawn_background,
+)
+from app.utils.message_edit import safe_edit
+from app.utils.participants_cache import invalidate_participants
+from app.utils.recipients_cache import get_all_user_ids, get_forecaster_ids
+from app.utils.player_pages import get_addable_players_page
 
 
 router = Router()
@@ -40,65 +72,60 @@ async def show_tournament_menu(
     message_or_cb: types.Message | types.CallbackQuery,
     state: FSMContext,
     tournament_id: int,
+    tournament: Tournament | Row | None = None,
 ):
-    """Displays the main management menu for a specific tournament."""
+    """
+    Displays the main management menu for a specific tournament.
+    Callers that just loaded (or changed) the tournament pass it in, saving a second session.
+    """
     await state.set_state(TournamentManagement.managing_tournament)
     await state.update_data(managed_tournament_id=tournament_id)
 
-    async with async_session() as session:
-        tournament = await session.get(Tournament, tournament_id)
+    if tournament is None:
+        async with async_session() as session:
+            # Plain row: the menu needs four columns, not a tracked ORM object
+            result = await session.execute(
+                select(
+                    Tournament.id, Tournament.name, Tournament.date, Tournament.status
+                ).where(Tournament.id == tournament_id)
+            )
+            tournament = result.first()
 
     if not tournament:
         await cmd_manage_tournaments(message_or_cb, state, "⚠️ Турнир не найден!")
         return
 
-    text = f"Управление турниром «{tournament.name}» от {tournament.date.strftime('%d.%m.%Y')} ({tournament.status.name})"
+    text = f"Управление турниром «{tournament.name}» от {format_date(tournament.date)} ({tournament.status.name})"
     kb = tournament_management_menu_kb(tournament)
 
     if isinstance(message_or_cb, types.Message):
         await message_or_cb.answer(text, reply_markup=kb)
     else:  # CallbackQuery
-        try:
-            await message_or_cb.message.edit_text(text, reply_markup=kb)
-        except Exception:
-            # Fallback if message to edit is not found (e.g., message was deleted)
-            await message_or_cb.message.answer(text, reply_markup=kb)
+        await safe_edit(message_or_cb, text, kb)
         await message_or_cb.answer()
 
 
-async def show_add_participant_menu(cb: types.CallbackQuery, state: FSMContext):
-    """Shows the paginated menu for adding players."""
+async def show_add_participant_menu(
+    target: types.Message | types.CallbackQuery, state: FSMContext
+):
+    """
+    Shows the paginated menu for adding players.
+    Edits the callback's message, or answers when called from a text message.
+    """
     data = await state.get_data()
     tournament_id = data["managed_tournament_id"]
-    async with async_session() as session:
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
-        )
-        participant_ids = {p.id for p in tournament.participants}
-        all_players_res = await session.execute(
-            select(Player).where(
-                or_(Player.is_active.is_(True), Player.is_active.is_(None))
-            )
-        )
-        all_players = all_players_res.scalars().all()
+    # Only the visible page is loaded; pagination re-queries by page number
+    players, total, page = await get_addable_players_page(tournament_id, 0)
 
     await state.set_state(TournamentManagement.adding_participant_choosing_player)
-    await state.update_data(
-        all_players={
-            p.id: {"name": p.full_name, "rating": p.current_rating} for p in all_players
-        }
-    )
 
-    kb = get_paginated_players_kb(
-        players=list(all_players),
-        action="add_player",
-        selected_ids=list(participant_ids),
-        tournament_id=tournament_id,
-        show_create_new=True,
-        show_back_to_menu=True,
-    )
-    await cb.message.edit_text("Выберите игрока для добавления:", reply_markup=kb)
-    await cb.answer()
+    kb = add_participants_kb(players, tournament_id, page, total)
+    text = "Выберите игрока для добавления:"
+    if isinstance(target, types.CallbackQuery):
+        await safe_edit(target, text, kb)
+        await target.answer()
+    else:
+        await target.answer(text, reply_markup=kb)
 
 
 async def show_remove_participant_menu(cb: types.CallbackQuery, state: FSMContext):
@@ -106,100 +133,108 @@ async def show_remove_participant_menu(cb: types.CallbackQuery, state: FSMContex
     data = await state.get_data()
     tournament_id = data["managed_tournament_id"]
     async with async_session() as session:
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
-        )
+        # Only the roster is shown, so the tournament row itself isn't loaded
+        participants = await crud.get_tournament_participants(session, tournament_id)
 
-    if not tournament.participants:
+    if not participants:
         await cb.answer("В турнире нет участников для удаления.", show_alert=True)
         return
 
     await state.set_state(TournamentManagement.removing_participant_choosing_player)
-    await state.update_data(
-        all_players={
-            p.id: {"name": p.full_name, "rating": p.current_rating}
-            for p in tournament.participants
-        }
-    )
+    await state.update_data(**player_columns(participants))
     kb = get_paginated_players_kb(
-        players=list(tournament.participants),
+        players=list(participants),
         action="remove_player",
         tournament_id=tournament_id,
         show_back_to_menu=True,
         include_inactive=True,
     )
-    await cb.message.edit_text("Выберите игрока для удаления:", reply_markup=kb)
+    await safe_edit(cb, "Выберите игрока для удаления:", kb)
     await cb.answer()
 
 
 # --- UI BUILDERS ---
 
 
-def tournament_management_menu_kb(tournament: Tournament) -> types.InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-    tournament_id = tournament.id
-
-    # Participant management is available only during setup
-    if tournament.status in [TournamentStatus.DRAFT, TournamentStatus.OPEN]:
-        builder.button(
-            text="➕ Добавить участника",
-            callback_data=f"tm_add_participant_start_{tournament_id}",
-        )
-        builder.button(
-            text="➖ Удалить участника",
-            callback_data=f"tm_remove_participant_start_{tournament_id}",
-        )
-
-    builder.button(
-        text="👥 Список участников",
-        callback_data=f"tm_list_participants_{tournament_id}",
-    )
-
-    if tournament.status == TournamentStatus.DRAFT:
-        builder.button(
-            text="📢 Опубликовать турнир", callback_data=f"tm_publish_{tournament_id}"
-        )
-    elif tournament.status == TournamentStatus.OPEN:
-        builder.button(
-            text="🔐 Закрыть ставки", callback_data=f"tm_close_bets_{tournament_id}"
-        )
-    elif tournament.status == TournamentStatus.LIVE:
-        builder.button(
-            text="🔓 Открыть ставки", callback_data=f"tm_open_bets_{tournament_id}"
-        )
-
-    # Results can only be set when the tournament is LIVE
-    if tournament.status == TournamentStatus.LIVE:
-        builder.button(
-            text="✏️ Ввести результаты",
-            callback_data=f"tm_set_results_start_{tournament_id}",
-        )
-
-    # Admin can always view forecasts (analytics)
-    builder.button(
-        text="👀 Прогнозы участников",
-        callback_data=f"vof_summary:{tournament_id}:tm_menu",
-    )
+_ADD_PARTICIPANT_BTN = ("➕ Добавить участника", "tm_add_participant_start_{id}")
+_REMOVE_PARTICIPANT_BTN = ("➖ Удалить участника", "tm_remove_participant_start_{id}")
+_LIST_PARTICIPANTS_BTN = ("👥 Список участников", "tm_list_participants_{id}")
+_PUBLISH_BTN = ("📢 Опубликовать турнир", "tm_publish_{id}")
+_CLOSE_BETS_BTN = ("🔐 Закрыть ставки", "tm_close_bets_{id}")
+_OPEN_BETS_BTN = ("🔓 Открыть ставки", "tm_open_bets_{id}")
+_SET_RESULTS_BTN = ("✏️ Ввести результаты", "tm_set_results_start_{id}")
+_FORECASTS_BTN = ("👀 Прогнозы участников", "vof_summary:{id}:tm_menu")
+_RESULTS_BTN = ("🏆 Результаты турнира", "tm_results_{id}")
+_DELETE_BTN = ("❌ Удалить турнир", "tm_delete_{id}")
+_BACK_TO_LIST_BTN = ("◀️ Назад к списку", "tm_back_to_list")
+
+# status -> (buttons in display order, adjust() row sizes), built once at import.
+# Participant management only during setup; results can be entered only when LIVE;
+# forecasts (analytics) are always available to the admin.
+_MENU_LAYOUTS = {
+    TournamentStatus.DRAFT: (
+        (
+            _ADD_PARTICIPANT_BTN,
+            _REMOVE_PARTICIPANT_BTN,
+            _LIST_PARTICIPANTS_BTN,
+            _PUBLISH_BTN,
+            _FORECASTS_BTN,
+            _DELETE_BTN,
+            _BACK_TO_LIST_BTN,
+        ),
+        (2, 1, 1, 1, 2),
+    ),
+    TournamentStatus.OPEN: (
+        (
+            _ADD_PARTICIPANT_BTN,
+            _REMOVE_PARTICIPANT_BTN,
+            _LIST_PARTICIPANTS_BTN,
+            _CLOSE_BETS_BTN,
+            _FORECASTS_BTN,
+            _DELETE_BTN,
+            _BACK_TO_LIST_BTN,
+        ),
+        (2, 1, 1, 1, 1, 2),
+    ),
+    TournamentStatus.LIVE: (
+        (
+            _LIST_PARTICIPANTS_BTN,
+            _OPEN_BETS_BTN,
+            _SET_RESULTS_BTN,
+            _FORECASTS_BTN,
+            _DELETE_BTN,
+            _BACK_TO_LIST_BTN,
+        ),
+        (1, 1, 1, 1, 2),
+    ),
+    TournamentStatus.FINISHED: (
+        (
+            _LIST_PARTICIPANTS_BTN,
+            _FORECASTS_BTN,
+            _RESULTS_BTN,
+            _DELETE_BTN,
+            _BACK_TO_LIST_BTN,
+        ),
+        (1, 1, 1, 2),
+    ),
+}
 
-    if tournament.status == TournamentStatus.FINISHED:
-        builder.button(
-            text="🏆 Результаты турнира", callback_data=f"tm_results_{tournament_id}"
-        )
 
-    builder.button(text="❌ Удалить турнир", callback_data=f"tm_delete_{tournament_id}")
-    builder.button(text="◀️ Назад к списку", callback_data="tm_back_to_list")
+@functools.lru_cache(maxsize=256)
+def _menu_markup(
+    status: TournamentStatus, tournament_id: int
+) -> types.InlineKeyboardMarkup:
+    # The markup depends only on (status, id) and is never mutated, so it is shared
+    buttons, layout = _MENU_LAYOUTS[status]
+    builder = InlineKeyboardBuilder()
+    for text, callback_data in buttons:
+        builder.button(text=text, callback_data=callback_data.format(id=tournament_id))
+    builder.adjust(*layout)
+    return builder.as_markup()
 
-    # Adjust layout based on status
-    if tournament.status == TournamentStatus.DRAFT:
-        builder.adjust(2, 1, 1, 1, 2)
-    elif tournament.status == TournamentStatus.OPEN:
-        builder.adjust(2, 1, 1, 1, 1, 2)
-    elif tournament.status == TournamentStatus.LIVE:
-        builder.adjust(1, 1, 1, 1, 2)
-    else:  # FINISHED
-        builder.adjust(1, 1, 1, 2)  # Adjusted for new button
 
-    return builder.as_markup()
+def tournament_management_menu_kb(tournament: Tournament | Row) -> types.InlineKeyboardMarkup:
+    return _menu_markup(tournament.status, tournament.id)
 
 
 # --- ROOT COMMAND & NAVIGATION ---
@@ -223,12 +258,7 @@ async def cmd_manage_tournaments(
     if isinstance(message, types.Message):
         await message.answer(text, reply_markup=kb)
     else:  # Is a CallbackQuery
-        try:
-            await message.message.edit_text(text, reply_markup=kb)
-        except:
-            if message.message:
-                await message.message.delete()
-            await message.from_user.send(text, reply_markup=kb)
+        await safe_edit(message, text, kb)
         await message.answer()
 
 
@@ -236,7 +266,7 @@ async def cmd_manage_tournaments(
     TournamentManagement.choosing_tournament, F.data.startswith("tm_group:")
 )
 async def cq_view_tournament_group(callback: types.CallbackQuery, state: FSMContext):
-    status_group = callback.data.split(":")[1]
+    status_group = callback.data.partition(":")[2]
     await list_tournaments_logic(callback, status_group, page=0)
 
 
@@ -248,39 +278,48 @@ async def cq_paginate_tournaments(callback: types.CallbackQuery, state: FSMConte
     await list_tournaments_logic(callback, status_group, int(page))
 
 
+_STATUS_GROUPS = {
+    "active": (
+        "⚡️ Актуальные турниры",
+        (TournamentStatus.DRAFT, TournamentStatus.OPEN, TournamentStatus.LIVE),
+    ),
+    "finished": ("🏁 Завершенные турниры", (TournamentStatus.FINISHED,)),
+}
+
+
 async def list_tournaments_logic(
     callback: types.CallbackQuery, status_group: str, page: int
 ):
+    if status_group not in _STATUS_GROUPS:
+        await callback.answer("Неизвестная группа", show_alert=True)
+        return
+    title, statuses = _STATUS_GROUPS[status_group]
+
     async with async_session() as session:
-        query = select(Tournament).order_by(Tournament.date.desc())
-
-        if status_group == "active":
-            query = query.where(
-                Tournament.status.in_(
-                    [
-                        TournamentStatus.DRAFT,
-                        TournamentStatus.OPEN,
-                        TournamentStatus.LIVE,
-                    ]
-                )
-            )
-            title = "⚡️ Актуальные турниры"
-        elif status_group == "finished":
-            query = query.where(Tournament.status == TournamentStatus.FINISHED)
-            title = "🏁 Завершенные турниры"
+        # Only the requested page is read; its rows carry the total for navigation
+        tournaments = await crud.get_tournaments_page(
+            session, statuses, page * TOURNAMENTS_PAGE_SIZE, TOURNAMENTS_PAGE_SIZE
+        )
+        if tournaments:
+            total = tournaments[0].total
         else:
-            await callback.answer("Неизвестная группа", show_alert=True)
-            return
-
-        result = await session.execute(query)
-        tournaments = result.scalars().all()
+            total = await crud.count_tournaments(session, statuses)
+            last_page = max(0, math.ceil(total / TOURNAMENTS_PAGE_SIZE) - 1)
+            if total and page > last_page:
+                # Stale page number (tournaments were deleted): show the last one
+                page = last_page
+                tournaments = await crud.get_tournaments_page(
+                    session, statuses, page * TOURNAMENTS_PAGE_SIZE, TOURNAMENTS_PAGE_SIZE
+                )
 
     if not tournaments:
         await callback.answer("В этой категории пока нет турниров.", show_alert=True)
         return
 
-    kb = get_paginated_tournaments_kb(tournaments, status_group, page)
-    await callback.message.edit_text(f"<b>{title}</b>", reply_markup=kb)
+    kb = get_paginated_tournaments_kb(
+        tournaments, status_group, page, total_tournaments=total
+    )
+    await safe_edit(callback, f"<b>{title}</b>", kb)
     await callback.answer()
 
 
@@ -289,7 +328,7 @@ async def cq_select_tournament_to_manage(
     callback: types.CallbackQuery, state: FSMContext
 ):
     await state.clear()
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     await show_tournament_menu(callback, state, tournament_id)
     await callback.answer()
 
@@ -337,6 +376,20 @@ async def msg_create_tournament_name(message: types.Message, state: FSMContext):
     )
 
 
+def _build_pred_count_kb() -> types.InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="3 места", callback_data="pred_count:3")
+    builder.button(text="5 мест", callback_data="pred_count:5")
+    builder.adjust(2)
+    builder.row(
+        types.InlineKeyboardButton(text="❌ Отмена", callback_data="fsm_cancel")
+    )
+    return builder.as_markup()
+
+
+_PRED_COUNT_KB = _build_pred_count_kb()
+
+
 @router.message(TournamentManagement.creating_tournament_enter_date)
 async def msg_create_tournament_date(message: types.Message, state: FSMContext):
     try:
@@ -352,17 +405,9 @@ async def msg_create_tournament_date(message: types.Message, state: FSMContext):
         TournamentManagement.creating_tournament_select_prediction_count
     )
 
-    builder = InlineKeyboardBuilder()
-    builder.button(text="3 места", callback_data="pred_count:3")
-    builder.button(text="5 мест", callback_data="pred_count:5")
-    builder.adjust(2)
-    builder.row(
-        types.InlineKeyboardButton(text="❌ Отмена", callback_data="fsm_cancel")
-    )
-
     await message.answer(
         "Сколько мест нужно будет угадать в этом турнире?",
-        reply_markup=builder.as_markup(),
+        reply_markup=_PRED_COUNT_KB,
     )
 
 
@@ -371,7 +416,7 @@ async def msg_create_tournament_date(message: types.Message, state: FSMContext):
     F.data.startswith("pred_count:"),
 )
 async def cq_create_tournament_finish(callback: types.CallbackQuery, state: FSMContext):
-    count = int(callback.data.split(":")[1])
+    count = int(callback.data.partition(":")[2])
     data = await state.get_data()
     name = data.get("name")
     event_date = datetime.date.fromisoformat(data.get("date"))
@@ -379,19 +424,17 @@ async def cq_create_tournament_finish(callback: types.CallbackQuery, state: FSMC
     async with async_session() as session:
         new_tournament = Tournament(name=name, date=event_date, prediction_count=count)
         session.add(new_tournament)
-        await session.commit()
-        # Refresh to get the ID
-        await session.refresh(new_tournament)
-
-        await callback.message.edit_text(
-            f"✅ Турнир '{name}' на {event_date.strftime('%d.%m.%Y')} успешно создан (Топ-{count})."
-        )
-        # Show menu for the NEW tournament
+        # The INSERT's RETURNING fills in the id at flush; no SELECT needed
+        await session.flush()
         new_tournament_id = new_tournament.id
+        await session.commit()
 
+    await callback.message.edit_text(
+        f"✅ Турнир '{name}' на {format_date(event_date)} успешно создан (Топ-{count})."
+    )
     await state.clear()
-    # We need to pass the ID. Since show_tournament_menu creates its own session, passing ID is fine.
-    await show_tournament_menu(callback, state, new_tournament_id)
+    # Show menu for the NEW tournament; its row is already in hand (status default is set at flush)
+    await show_tournament_menu(callback, state, new_tournament_id, new_tournament)
 
 
 @router.callback_query(
@@ -400,7 +443,7 @@ async def cq_create_tournament_finish(callback: types.CallbackQuery, state: FSMC
 async def cq_delete_tournament_confirm(
     callback: types.CallbackQuery, state: FSMContext
 ):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     await state.update_data(delete_tournament_id=tournament_id)
     await callback.message.edit_text(
         f"Вы уверены, что хотите удалить турнир ID {tournament_id}? Это действие необратимо.",
@@ -418,7 +461,12 @@ async def cq_delete_tournament_execute(
     data = await state.get_data()
     tournament_id = data.get("delete_tournament_id")
     async with async_session() as session:
-        await session.execute(delete(Tournament).where(Tournament.id == tournament_id))
+        # Forecasts and participant links are removed by ON DELETE CASCADE
+        await session.execute(
+            delete(Tournament)
+            .where(Tournament.id == tournament_id)
+            .execution_options(synchronize_session=False)
+        )
         await session.commit()
     await callback.answer(f"Турнир ID {tournament_id} удален.", show_alert=True)
     await cmd_manage_tournaments(callback, state)
@@ -433,173 +481,205 @@ async def cq_delete_tournament_cancel(callback: types.CallbackQuery, state: FSMC
     await show_tournament_menu(callback, state, tournament_id)
 
 
+# Earlier created_at values are the placeholder written by the migration
+_REAL_CREATED_AT_FROM = datetime.datetime(2024, 1, 1, 0, 0, 1)
+
+
 @router.callback_query(
     TournamentManagement.managing_tournament, F.data.startswith("tm_results_")
 )
 async def cq_show_tournament_results(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
 
     async with async_session() as session:
-        # Load tournament with forecasts and users
-        tournament = await session.get(
-            Tournament,
-            tournament_id,
-            options=[selectinload(Tournament.forecasts).selectinload(Forecast.user)],
+        tournament_name = await session.scalar(
+            select(Tournament.name).where(Tournament.id == tournament_id)
+        )
+        # Points descending (unscored as 0), earlier forecast wins a tie: sorted by the DB
+        forecasts_res = await session.execute(
+            select(Forecast)
+            .options(selectinload(Forecast.user))
+            .where(Forecast.tournament_id == tournament_id)
+            .order_by(
+                func.coalesce(Forecast.points_earned, 0).desc(),
+                Forecast.created_at.asc(),
+            )
         )
+        sorted_forecasts = forecasts_res.scalars().all()
 
-        if not tournament or not tournament.forecasts:
-            await callback.answer("Нет данных о прогнозах.", show_alert=True)
-            return
+    if tournament_name is None or not sorted_forecasts:
+        await callback.answer("Нет данных о прогнозах.", show_alert=True)
+        return
 
-        # Sort forecasts by points descending, then by created_at ascending (who predicted earlier wins tie)
-        sorted_forecasts = sorted(
-            tournament.forecasts,
-            key=lambda f: (f.points_earned or 0, f.created_at),
-            reverse=True,  # Reversing logic: points DESC, created_at DESC (wrong).
-        )
-        # Manual stable sort for correct order:
-        sorted_forecasts.sort(
-            key=lambda f: f.created_at
-        )  # Sort ASC by time (earlier is better)
-        sorted_forecasts.sort(
-            key=lambda f: (f.points_earned or 0), reverse=True
-        )  # Sort DESC by points
-
-        text = f"<b>🏆 Результаты турнира «{tournament.name}»</b>\n\n<code>"
-        text += "#   Имя             Баллы   Время\n"
-        text += "--------------------------------------\n"  # Adjusted separator length
-
-        for i, f in enumerate(sorted_forecasts, 1):
-            display_name = f.user.full_name or f.user.username or f"id{f.user_id}"
-            if f.user.full_name and f.user.username:
-                display_name = f"{f.user.full_name} (@{f.user.username})"
-            elif f.user.username:
-                display_name = f"@{f.user.username}"
-
-            points = f.points_earned or 0
-
-            # Conditional display of created_at
-            if f.created_at and f.created_at >= datetime.datetime(
-                2024, 1, 1, 0, 0, 1
-            ):  # If not the fake time from migration
-                # For the new created_at, it's default=datetime.datetime.utcnow, which means it will be a real timestamp.
-                # The fake one starts at 2024-01-01 00:00:00.
-                # So check for "real" time or "just after fake base time"
-                created_time_str = f.created_at.strftime("%H:%M")  # Just HH:MM
+    lines = [
+        f"<b>🏆 Результаты турнира «{tournament_name}»</b>\n\n<code>"
+        "#   Имя             Баллы   Время",
+        "--------------------------------------",  # Adjusted separator length
+    ]
+    for i, f in enumerate(sorted_forecasts, 1):
+        display_name = f.user.full_name or f.user.username or f"id{f.user_id}"
+        if f.user.full_name and f.user.username:
+            display_name = f"{f.user.full_name} (@{f.user.username})"
+        elif f.user.username:
+            display_name = f"@{f.user.username}"
+
+        points = f.points_earned or 0
+
+        # Conditional display of created_at
+        if f.created_at and f.created_at >= _REAL_CREATED_AT_FROM:
+            # Forecasts migrated without a timestamp got a fake one at 2024-01-01 00:00:00
+            created_time_str = f.created_at.strftime("%H:%M")  # Just HH:MM
+        else:
+            created_time_str = (
+                "N/A  "  # Placeholder for old/fake entries, with padding
+            )
+
+        # Adjust display_name to fit in 15 characters, prioritizing username if present
+        final_display_name = display_name
+        if len(final_display_name) > 15:
+            if f.user.username and len(f"@{f.user.username}") <= 15:
+                final_display_name = f"@{f.user.username}"
+            elif f.user.full_name and len(f.user.full_name) <= 15:
+                final_display_name = f.user.full_name
             else:
-                created_time_str = (
-                    "N/A  "  # Placeholder for old/fake entries, with padding
-                )
+                final_display_name = final_display_name[:12] + "..."
 
-            # Adjust display_name to fit in 15 characters, prioritizing username if present
-            final_display_name = display_name
-            if len(final_display_name) > 15:
-                if f.user.username and len(f"@{f.user.username}") <= 15:
-                    final_display_name = f"@{f.user.username}"
-                elif f.user.full_name and len(f.user.full_name) <= 15:
-                    final_display_name = f.user.full_name
-                else:
-                    final_display_name = final_display_name[:12] + "..."
-
-            place_icon = f"{i}."
-            if i == 1:
-                place_icon = "🥇"
-            elif i == 2:
-                place_icon = "🥈"
-            elif i == 3:
-                place_icon = "🥉"
-
-            # Adjusted points width to ensure alignment
-            line = f"{place_icon:<3} {final_display_name:<15} {points:>5}   {created_time_str}"  # Points width increased to 5
-            text += f"{line}\n"
-
-        text += "</code>"
-
-        builder = InlineKeyboardBuilder()
-        builder.button(
-            text="◀️ Назад", callback_data=f"manage_tournament_{tournament_id}"
+        # Medal for the podium, "N." below it
+        place_icon = get_medal_str(i)
+
+        # Adjusted points width to ensure alignment
+        lines.append(
+            f"{place_icon:<3} {final_display_name:<15} {points:>5}   {created_time_str}"
         )
+    text = "\n".join(lines) + "\n</code>"
 
-        await callback.message.edit_text(text, reply_markup=builder.as_markup())
-        await callback.answer()
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="◀️ Назад", callback_data=f"manage_tournament_{tournament_id}"
+    )
+
+    await callback.message.edit_text(text, reply_markup=builder.as_markup())
+    await callback.answer()
 
 
 # --- PARTICIPANT MANAGEMENT ---
 
 
+def _player_with_tournament_stmt(player_id: int, tournament_id: int):
+    """Loads a player and a tournament in one round trip (tournament is None if missing)."""
+    return (
+        select(Player, Tournament)
+        .outerjoin(Tournament, Tournament.id == tournament_id)
+        .where(Player.id == player_id)
+    )
+
+
 async def add_player_to_tournament_logic(
     message: types.Message | types.CallbackQuery,
     state: FSMContext,
     player_id: int,
     tournament_id: int,
+    update_rating: bool = False,
+    new_rating: int | None = None,
 ):
-    """Helper to finalize adding a player to the tournament."""
+    """
+    Helper to finalize adding a player to the tournament.
+    With update_rating, the player's rating is set to new_rating in the same transaction.
+    """
+    added = None
+    # DB work only: the connection is released before any Telegram call
     async with async_session() as session:
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
-        )
-        player = await session.get(Player, player_id)
+        if update_rating:
+            await session.execute(
+                update(Player)
+                .where(Player.id == player_id)
+                .values(current_rating=new_rating)
+                .execution_options(synchronize_session=False)
+            )
+        row = (
+            await session.execute(_player_with_tournament_stmt(player_id, tournament_id))
+        ).first()
+        player, tournament = row if row else (None, None)
+
+        # A deleted tournament leaves the rating update uncommitted (rolled back on close)
+        if tournament is not None:
+            if player is not None and is_player_active(player):
+                # Membership check and insert in one statement; None means already registered
+                added = await session.scalar(
+                    pg_insert(tournament_participants)
+                    .values(tournament_id=tournament_id, player_id=player_id)
+                    .on_conflict_do_nothing()
+                    .returning(tournament_participants.c.player_id)
+                )
+            if update_rating or added is not None:
+                await session.commit()
 
-        if player is None:
-            if isinstance(message, types.CallbackQuery):
-                await message.answer("Игрок не найден.", show_alert=True)
-            else:
-                await message.answer("Игрок не найден.")
-            return
+    if player is None:
+        if isinstance(message, types.CallbackQuery):
+            await message.answer("Игрок не найден.", show_alert=True)
+        else:
+            await message.answer("Игрок не найден.")
+        return
 
-        if not is_player_active(player):
-            text = "Нельзя добавить архивированного игрока в турнир. Сначала восстановите его в управлении игроками."
-            if isinstance(message, types.CallbackQuery):
-                await message.answer(text, show_alert=True)
-                await show_add_participant_menu(message, state)
-            else:
-                await message.answer(text)
-            return
+    if tournament is None:
+        if isinstance(message, types.CallbackQuery):
+            await message.answer("⚠️ Турнир не найден!", show_alert=True)
+        else:
+            await message.answer("⚠️ Турнир не найден!")
+        return
 
-        if player not in tournament.participants:
-            tournament.participants.append(player)
-            await session.commit()
-            text = f"✅ {player.full_name} добавлен"
-            if player.current_rating is not None:
-                text += f" (Рейтинг: {player.current_rating})"
-            else:
-                text += " (Без рейтинга)"
+    if update_rating:
+        # The new rating shows in every roster the player is on, not just this one
+        invalidate_participants()
 
-            await notify_predictors_of_change(
-                message.bot, session, tournament, player, "added"
-            )
+    if not is_player_active(player):
+        text = "Нельзя добавить архивированного игрока в турнир. Сначала восстановите его в управлении игроками."
+        if isinstance(message, types.CallbackQuery):
+            await message.answer(text, show_alert=True)
+            await show_add_participant_menu(message, state)
+        else:
+            await message.answer(text)
+        return
 
-            if isinstance(message, types.CallbackQuery):
-                await message.message.edit_text(
-                    text, reply_markup=add_player_success_kb(tournament_id)
-                )
-                await message.answer()  # Close loading animation
-            else:
-                # If from a message (e.g. initial add_player text input), send new message
-                await message.answer(
-                    text, reply_markup=add_player_success_kb(tournament_id)
-                )
+    if added is not None:
+        invalidate_participants(tournament_id)
+        text = f"✅ {player.full_name} добавлен"
+        if player.current_rating is not None:
+            text += f" (Рейтинг: {player.current_rating})"
         else:
-            if isinstance(message, types.CallbackQuery):
-                await message.answer(
-                    f"⚠️ {player.full_name} уже в турнире.", show_alert=True
+            text += " (Без рейтинга)"
+
+        if tournament.status == TournamentStatus.OPEN:
+            # Fan-out runs in the background so the admin's menu isn't held up
+            spawn_background(
+                notify_predictors_of_change(
+                    message.bot,
+                    tournament.id,
+                    tournament.name,
+                    player.full_name,
+                    player.current_rating,
+                    "added",
                 )
-            else:
-                await message.answer(f"⚠️ {player.full_name} уже в турнире.")
+            )
 
-            # If duplicate, we return to the menu so user can pick someone else
-            if isinstance(message, types.CallbackQuery):
-                await show_add_participant_menu(message, state)
-            else:
-                # For text input duplicate (unlikely in this flow but possible), we need to restore state
-                await state.set_state(
-                    TournamentManagement.adding_participant_choosing_player
-                )
-                # Re-show menu? Hard with message object. Let's just let them use previous menu or send a new one.
-                # Since text input comes from "New Player" flow, and we check duplicate name earlier...
-                # This else block is for "Player ID is already in tournament".
-                # This happens if they select same existing player twice.
-                pass
+        if isinstance(message, types.CallbackQuery):
+            await message.message.edit_text(
+                text, reply_markup=add_player_success_kb(tournament_id)
+            )
+            await message.answer()  # Close loading animation
+        else:
+            # If from a message (e.g. initial add_player text input), send new message
+            await message.answer(
+                text, reply_markup=add_player_success_kb(tournament_id)
+            )
+    else:
+        if isinstance(message, types.CallbackQuery):
+            await message.answer(f"⚠️ {player.full_name} уже в турнире.", show_alert=True)
+        else:
+            await message.answer(f"⚠️ {player.full_name} уже в турнире.")
+
+        # If duplicate, we return to the menu so user can pick someone else
+        await show_add_participant_menu(message, state)
 
     # REMOVED: The unconditional call to show_add_participant_menu
     # User will use the buttons in success message to navigate.
@@ -609,28 +689,31 @@ async def add_player_to_tournament_logic(
     TournamentManagement.managing_tournament, F.data.startswith("tm_list_participants_")
 )
 async def cq_list_participants(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     async with async_session() as session:
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
+        tournament_name = await session.scalar(
+            select(Tournament.name).where(Tournament.id == tournament_id)
         )
-    text = f"<b>Участники турнира «{tournament.name}»</b>\n\n"
-    if not tournament.participants:
+        # Sorted by the DB (rating desc, then name), see ix_players_rating_name
+        result = await session.execute(
+            select(Player.full_name, Player.current_rating, Player.is_active)
+            .join(
+                tournament_participants,
+                tournament_participants.c.player_id == Player.id,
+            )
+            .where(tournament_participants.c.tournament_id == tournament_id)
+            .order_by(Player.current_rating.desc().nullslast(), Player.full_name)
+        )
+        rows = result.all()
+    text = f"<b>Участники турнира «{tournament_name}»</b>\n\n"
+    if not rows:
         text += "В этом турнире пока нет зарегистрированных участников."
     else:
-        # Sort by rating (desc) then name
-        sorted_participants = sorted(
-            tournament.participants,
-            key=lambda p: (-(p.current_rating or 0), p.full_name),
+        text += "\n".join(
+            f"• {name}{f' ({rating})' if rating is not None else ''}"
+            f"{' [архив]' if is_active is False else ''}"
+            for name, rating, is_active in rows
         )
-        lines = []
-        for p in sorted_participants:
-            rating_str = (
-                f" ({p.current_rating})" if p.current_rating is not None else ""
-            )
-            archived_suffix = " [архив]" if not is_player_active(p) else ""
-            lines.append(f"• {p.full_name}{rating_str}{archived_suffix}")
-        text += "\n".join(lines)
 
     builder = InlineKeyboardBuilder()
     builder.button(
@@ -642,7 +725,7 @@ async def cq_list_participants(callback: types.CallbackQuery, state: FSMContext)
 
 @router.callback_query(F.data.startswith("tm_add_participant_start_"))
 async def cq_add_participant_start(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     await state.update_data(managed_tournament_id=tournament_id)
     await show_add_participant_menu(callback, state)
     await callback.answer()
@@ -650,52 +733,68 @@ async def cq_add_participant_start(callback: types.CallbackQuery, state: FSMCont
 
 async def notify_predictors_of_change(
     bot: Bot,
-    session: async_session,
-    tournament: Tournament,
-    changed_player: Player,
+    tournament_id: int,
+    tournament_name: str,
+    player_name: str,
+    player_rating: int | None,
     action: str,
 ):
     """Notifies users who have made a forecast about a change in participants."""
-    if tournament.status != TournamentStatus.OPEN:
-        return
-
-    forecasts_res = await session.execute(
-        select(Forecast).where(Forecast.tournament_id == tournament.id)
-    )
-    forecasts = forecasts_res.scalars().all()
-
-    if not forecasts:
-        return
-
     action_text = "добавлен в" if action == "added" else "удален из"
-    rating_info = (
-        f" (Рейтинг: {changed_player.current_rating})"
-        if changed_player.current_rating is not None
-        else ""
-    )
-    p_name = html.escape(changed_player.full_name)
-    t_name = html.escape(tournament.name)
+    rating_info = f" (Рейтинг: {player_rating})" if player_rating is not None else ""
+    p_name = html.escape(player_name)
+    t_name = html.escape(tournament_name)
     message_text = (
         f"Внимание! Участник <b>{p_name}</b>{rating_info} был {action_text} турнир «{t_name}».\n"
         "Возможно, вы захотите обновить свой прогноз."
     )
+    await _notify_predictors(bot, tournament_id, message_text)
+
+
+async def notify_predictors_of_additions(
+    bot: Bot,
+    tournament_id: int,
+    tournament_name: str,
+    players: list[Row],
+):
+    """Sends forecasters one message listing all players added in a batch."""
+    lines = [
+        f"• <b>{html.escape(p.full_name)}</b>"
+        + (f" (Рейтинг: {p.current_rating})" if p.current_rating is not None else "")
+        for p in players
+    ]
+    message_text = (
+        f"Внимание! В турнир «{html.escape(tournament_name)}» добавлены участники:\n"
+        + "\n".join(lines)
+        + "\nВозможно, вы захотите обновить свой прогноз."
+    )
+    await _notify_predictors(bot, tournament_id, message_text)
+
+
+async def _notify_predictors(bot: Bot, tournament_id: int, message_text: str):
+    """Sends message_text once to every user with a forecast for the tournament."""
+    # Distinct recipients, shared with the status-change broadcasts via the cache
+    user_ids = await get_forecaster_ids(tournament_id)
+
+    if not user_ids:
+        return
 
     builder = InlineKeyboardBuilder()
     builder.button(
-        text="Перейти к прогнозу", callback_data=f"view_forecast:{tournament.id}"
+        text="Перейти к прогнозу", callback_data=f"view_forecast:{tournament_id}"
     )
     kb = builder.as_markup()
 
-    for forecast in forecasts:
-        try:
-            await bot.send_message(
-                forecast.user_id, message_text, reply_markup=kb, parse_mode="HTML"
-            )
-            await asyncio.sleep(0.2)
-        except Exception as e:
-            logging.warning(
-                f"Failed to send participant change notification to user {forecast.user_id}: {e}"
+    # Sends run concurrently; the shared limiter keeps them under Telegram's rate limit
+    await asyncio.gather(
+        *(
+            send_message_safe(
+                bot, user_id, message_text, reply_markup=kb, parse_mode="HTML"
             )
+            for user_id in user_ids
+        ),
+        return_exceptions=True,
+    )
 
 
 async def show_rating_options_menu(
@@ -745,7 +844,7 @@ async def show_rating_options_menu(
     if isinstance(message_or_cb, types.Message):
         await message_or_cb.answer(text, reply_markup=builder.as_markup())
     else:
-        await message_or_cb.message.edit_text(text, reply_markup=builder.as_markup())
+        await safe_edit(message_or_cb, text, builder.as_markup())
     await message_or_cb.answer()
 
 
@@ -767,12 +866,10 @@ async def cq_rating_clear(callback: types.CallbackQuery, state: FSMContext):
     player_id = data.get("selected_player_id")
     tournament_id = data.get("managed_tournament_id")
 
-    async with async_session() as session:
-        player = await session.get(Player, player_id)
-        player.current_rating = None
-        await session.commit()
-
-    await add_player_to_tournament_logic(callback, state, player_id, tournament_id)
+    # The rating is written in the same transaction as the registration
+    await add_player_to_tournament_logic(
+        callback, state, player_id, tournament_id, update_rating=True, new_rating=None
+    )
 
 
 @router.callback_query(
@@ -821,12 +918,10 @@ async def msg_rating_input(message: types.Message, state: FSMContext):
     player_id = data.get("selected_player_id")
     tournament_id = data.get("managed_tournament_id")
 
-    async with async_session() as session:
-        player = await session.get(Player, player_id)
-        player.current_rating = new_rating
-        await session.commit()
-
-    await add_player_to_tournament_logic(message, state, player_id, tournament_id)
+    # The rating is written in the same transaction as the registration
+    await add_player_to_tournament_logic(
+        message, state, player_id, tournament_id, update_rating=True, new_rating=new_rating
+    )
 
 
 @router.callback_query(
@@ -843,11 +938,131 @@ async def cq_rating_cancel(callback: types.CallbackQuery, state: FSMContext):
 )
 async def cq_add_participant_select(callback: types.CallbackQuery, state: FSMContext):
     """Handles selection of an existing player to add."""
-    player_id = int(callback.data.split(":")[1])
+    player_id = int(callback.data.partition(":")[2])
     await state.update_data(selected_player_id=player_id)
     await show_rating_options_menu(callback, state, player_id)
 
 
+# --- BULK ADD ---
+
+
+async def _show_bulk_add_page(callback: types.CallbackQuery, state: FSMContext):
+    """Re-renders the multi-select page the admin is on."""
+    data = await state.get_data()
+    tournament_id = data["managed_tournament_id"]
+    players, total, page = await get_addable_players_page(
+        tournament_id, data.get("bulk_page", 0)
+    )
+    kb = add_participants_kb(
+        players, tournament_id, page, total, set(data.get("bulk_selected_ids", []))
+    )
+    await safe_edit(callback, "Отметьте игроков и нажмите «Готово»:", kb)
+
+
+@router.callback_query(
+    TournamentManagement.adding_participant_choosing_player,
+    F.data == "tm_add_bulk_start",
+)
+async def cq_add_bulk_start(callback: types.CallbackQuery, state: FSMContext):
+    await state.set_state(TournamentManagement.adding_participants_bulk)
+    # A list, not a set: FSM data is stored as JSON
+    await state.update_data(bulk_selected_ids=[], bulk_page=0)
+    await _show_bulk_add_page(callback, state)
+    await callback.answer()
+
+
+@router.callback_query(
+    TournamentManagement.adding_participants_bulk,
+    F.data.startswith("add_player_multi:"),
+)
+async def cq_add_bulk_toggle(callback: types.CallbackQuery, state: FSMContext):
+    player_id = int(callback.data.partition(":")[2])
+    data = await state.get_data()
+    selected_ids = data.get("bulk_selected_ids", [])
+    if player_id in selected_ids:
+        selected_ids.remove(player_id)
+    else:
+        selected_ids.append(player_id)
+    await state.update_data(bulk_selected_ids=selected_ids)
+    await _show_bulk_add_page(callback, state)
+    await callback.answer()
+
+
+@router.callback_query(
+    TournamentManagement.adding_participants_bulk, F.data == "tm_add_confirm"
+)
+async def cq_add_bulk_confirm(callback: types.CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    tournament_id = data["managed_tournament_id"]
+    selected_ids = data.get("bulk_selected_ids", [])
+    if not selected_ids:
+        await callback.answer("Не выбрано ни одного игрока.", show_alert=True)
+        return
+
+    async with async_session() as session:
+        tournament = (
+            await session.execute(
+                select(Tournament.name, Tournament.status).where(
+                    Tournament.id == tournament_id
+                )
+            )
+        ).first()
+        if tournament is None:
+            await callback.answer("⚠️ Турнир не найден.", show_alert=True)
+            return
+        # One INSERT ... SELECT for the whole batch: archived players are filtered
+        # out by the SELECT, players added meanwhile are skipped by ON CONFLICT
+        added_ids = (
+            await session.scalars(
+                pg_insert(tournament_participants)
+                .from_select(
+                    ["tournament_id", "player_id"],
+                    select(literal(tournament_id), Player.id).where(
+                        Player.id.in_(selected_ids),
+                        or_(Player.is_active.is_(True), Player.is_active.is_(None)),
+                    ),
+                )
+                .on_conflict_do_nothing()
+                .returning(tournament_participants.c.player_id)
+            )
+        ).all()
+        added = []
+        if added_ids:
+            added = (
+                await session.execute(
+                    select(Player.full_name, Player.current_rating)
+                    .where(Player.id.in_(added_ids))
+                    .order_by(Player.current_rating.desc().nullslast(), Player.full_name)
+                )
+            ).all()
+            await session.commit()
+
+    await state.set_state(TournamentManagement.adding_participant_choosing_player)
+    await state.update_data(bulk_selected_ids=[], bulk_page=0)
+
+    if not added:
+        await callback.answer("⚠️ Выбранные игроки уже в турнире.", show_alert=True)
+        await show_add_participant_menu(callback, state)
+        return
+
+    invalidate_participants(tournament_id)
+    if tournament.status == TournamentStatus.OPEN:
+        # One message per forecaster for the whole batch
+        spawn_background(
+            notify_predictors_of_additions(
+                callback.bot, tournament_id, tournament.name, added
+            )
+        )
+
+    text = f"✅ Добавлено участников: {len(added)}\n" + "\n".join(
+        f"• {p.full_name}"
+        + (f" ({p.current_rating})" if p.current_rating is not None else "")
+        for p in added
+    )
+    await safe_edit(callback, text, add_player_success_kb(tournament_id))
+    await callback.answer()
+
+
 @router.callback_query(
     TournamentManagement.adding_participant_choosing_player,
     F.data == "create_new:add_player",
@@ -863,72 +1078,52 @@ async def cq_add_participant_create_new(
 @router.message(TournamentManagement.adding_participant_creating_new)
 async def msg_add_participant_create_and_add(message: types.Message, state: FSMContext):
     new_player_name = message.text.strip()
-    data = await state.get_data()
 
     async with async_session() as session:
-        existing_player = await session.scalar(
-            select(Player).where(
-                func.lower(Player.full_name) == func.lower(new_player_name)
-            )
-        )
-        if existing_player:
-            if not is_player_active(existing_player):
-                await message.answer(
-                    f"⚠️ Игрок '{new_player_name}' уже есть в архиве. Восстановите его в управлении игроками, а затем добавьте в турнир."
-                )
-                await state.clear()
-                return
-
-            await message.answer(
-                f"⚠️ Игрок '{new_player_name}' уже существует. Добавьте его из списка."
+        # One round trip in the common case; ix_players_full_name_lower arbitrates
+        # case-insensitive duplicates, including two admins racing on the same name
+        new_player = (
+            await session.execute(
+                pg_insert(Player)
+                .values(full_name=new_player_name)
+                .on_conflict_do_nothing(index_elements=[func.lower(Player.full_name)])
+                .returning(Player.id, Player.full_name)
             )
-            tournament_id = data.get("managed_tournament_id")
-            await state.set_state(
-                TournamentManagement.adding_participant_choosing_player
-            )
-            tournament = await session.get(
-                Tournament,
-                tournament_id,
-                options=[selectinload(Tournament.participants)],
-            )
-            participant_ids = {p.id for p in tournament.participants}
-            all_players_res = await session.execute(
+        ).first()
+        existing_player = None
+        if new_player is None:
+            existing_player = await session.scalar(
                 select(Player).where(
-                    or_(Player.is_active.is_(True), Player.is_active.is_(None))
+                    func.lower(Player.full_name) == func.lower(new_player_name)
                 )
             )
-            all_players = all_players_res.scalars().all()
-            await state.update_data(
-                all_players={
-                    p.id: {"name": p.full_name, "rating": p.current_rating}
-                    for p in all_players
-                }
-            )
-            kb = get_paginated_players_kb(
-                players=list(all_players),
-                action="add_player",
-                selected_ids=list(participant_ids),
-                tournament_id=tournament_id,
-                show_create_new=True,
-                show_back_to_menu=True,
-            )
-            await message.answer("Выберите игрока для добавления:", reply_markup=kb)
-            return
         else:
-            new_player = Player(full_name=new_player_name)
-            session.add(new_player)
             await session.commit()
-            await session.refresh(new_player)
-
-            await state.update_data(selected_player_id=new_player.id)
 
-            text = (
-                f"✅ Новый игрок <b>{new_player.full_name}</b> создан.\n\n"
-                "Введите его рейтинг (целое число) или нажмите кнопку, чтобы оставить без рейтинга:"
+    # The menu below opens its own sessions, so ours is closed first
+    if existing_player:
+        if not is_player_active(existing_player):
+            await message.answer(
+                f"⚠️ Игрок '{new_player_name}' уже есть в архиве. Восстановите его в управлении игроками, а затем добавьте в турнир."
             )
+            await state.clear()
+            return
+
+        await message.answer(
+            f"⚠️ Игрок '{new_player_name}' уже существует. Добавьте его из списка."
+        )
+        await show_add_participant_menu(message, state)
+        return
 
-            await state.set_state(TournamentManagement.adding_new_participant_rating)
-            await message.answer(text, reply_markup=new_player_rating_kb())
+    await state.update_data(selected_player_id=new_player.id)
+
+    text = (
+        f"✅ Новый игрок <b>{new_player.full_name}</b> создан.\n\n"
+        "Введите его рейтинг (целое число) или нажмите кнопку, чтобы оставить без рейтинга:"
+    )
+
+    await state.set_state(TournamentManagement.adding_new_participant_rating)
+    await message.answer(text, reply_markup=new_player_rating_kb())
 
 
 @router.message(TournamentManagement.adding_new_participant_rating)
@@ -945,12 +1140,10 @@ async def msg_new_player_rating_input(message: types.Message, state: FSMContext)
     player_id = data.get("selected_player_id")
     tournament_id = data.get("managed_tournament_id")
 
-    async with async_session() as session:
-        player = await session.get(Player, player_id)
-        player.current_rating = new_rating
-        await session.commit()
-
-    await add_player_to_tournament_logic(message, state, player_id, tournament_id)
+    # The rating is written in the same transaction as the registration
+    await add_player_to_tournament_logic(
+        message, state, player_id, tournament_id, update_rating=True, new_rating=new_rating
+    )
 
 
 @router.callback_query(
@@ -970,7 +1163,7 @@ async def cq_new_player_rating_skip(callback: types.CallbackQuery, state: FSMCon
     F.data.startswith("tm_remove_participant_start_"),
 )
 async def cq_remove_participant_start(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     await state.update_data(managed_tournament_id=tournament_id)
     await show_remove_participant_menu(callback, state)
     await callback.answer()
@@ -983,24 +1176,43 @@ async def cq_remove_participant_start(callback: types.CallbackQuery, state: FSMC
 async def cq_remove_participant_select(
     callback: types.CallbackQuery, state: FSMContext
 ):
-    player_id = int(callback.data.split(":")[1])
+    player_id = int(callback.data.partition(":")[2])
     data = await state.get_data()
     tournament_id = data["managed_tournament_id"]
     async with async_session() as session:
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
-        )
-        player_to_remove = await session.get(Player, player_id)
+        row = (
+            await session.execute(_player_with_tournament_stmt(player_id, tournament_id))
+        ).first()
+        if row is None:
+            # Player was deleted meanwhile; the refreshed list no longer shows them
+            await callback.answer("Игрок не найден.", show_alert=True)
+            await show_remove_participant_menu(callback, state)
+            return
+        player_to_remove, tournament = row
 
-        if player_to_remove in tournament.participants:
-            tournament.participants.remove(player_to_remove)
+        result = await session.execute(
+            delete(tournament_participants).where(
+                tournament_participants.c.tournament_id == tournament_id,
+                tournament_participants.c.player_id == player_id,
+            )
+        )
+        if result.rowcount:
             await session.commit()
+            invalidate_participants(tournament_id)
             await callback.answer(
                 f"✅ {player_to_remove.full_name} удален.", show_alert=True
             )
-            await notify_predictors_of_change(
-                callback.bot, session, tournament, player_to_remove, "removed"
-            )
+            if tournament is not None and tournament.status == TournamentStatus.OPEN:
+                spawn_background(
+                    notify_predictors_of_change(
+                        callback.bot,
+                        tournament.id,
+                        tournament.name,
+                        player_to_remove.full_name,
+                        player_to_remove.current_rating,
+                        "removed",
+                    )
+                )
         else:
             await callback.answer(
                 f"⚠️ {player_to_remove.full_name} уже был удален.", show_alert=True
@@ -1012,63 +1224,95 @@ async def cq_remove_participant_select(
 # --- TOURNAMENT ACTIONS & SCORING ---
 
 
+async def _transition_status(
+    session: AsyncSession,
+    tournament_id: int,
+    from_status: TournamentStatus,
+    to_status: TournamentStatus,
+    *conditions,
+) -> Row | None:
+    """
+    Moves the tournament from from_status to to_status in one conditional UPDATE.
+    Returns the updated (id, name, date, status) row, or None if it wasn't in from_status,
+    failed one of the extra conditions (or doesn't exist); the DB decides, so two admins
+    can't both make the same transition.
+    """
+    result = await session.execute(
+        update(Tournament)
+        .where(Tournament.id == tournament_id, Tournament.status == from_status, *conditions)
+        .values(status=to_status)
+        .returning(Tournament.id, Tournament.name, Tournament.date, Tournament.status)
+    )
+    return result.first()
+
+
 @router.callback_query(
     TournamentManagement.managing_tournament, F.data.startswith("tm_publish_")
 )
 async def cq_publish_tournament(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     async with async_session() as session:
-        # Load with participants for validation
-        tournament = await session.get(
-            Tournament, tournament_id, options=[selectinload(Tournament.participants)]
+        # Status guard and roster size are checked by the UPDATE itself: one round trip
+        participants = crud.active_participants_count(tournament_id)
+        tournament = await _transition_status(
+            session,
+            tournament_id,
+            TournamentStatus.DRAFT,
+            TournamentStatus.OPEN,
+            participants >= func.coalesce(Tournament.prediction_count, 5),
         )
-        if not tournament:
+        if tournament is not None:
+            await session.commit()
+        else:
+            # Only a refused publish needs the details, to explain why
+            current = (
+                await session.execute(
+                    select(
+                        Tournament.status,
+                        Tournament.prediction_count,
+                        participants.label("participants"),
+                    ).where(Tournament.id == tournament_id)
+                )
+            ).first()
+
+    if tournament is None:
+        if current is None:
             await callback.answer("⚠️ Турнир не найден.", show_alert=True)
-            return
-        if tournament.status != TournamentStatus.DRAFT:
+        elif current.status != TournamentStatus.DRAFT:
             await callback.answer(
-                f"⚠️ Этот турнир уже опубликован или начат. Статус: {tournament.status.name}",
+                f"⚠️ Этот турнир уже опубликован или начат. Статус: {current.status.name}",
                 show_alert=True,
             )
-            return
-
-        # Validate participant count
-        min_count = tournament.prediction_count or 5
-        current_count = len(
-            [player for player in tournament.participants if is_player_active(player)]
-        )
-        if current_count < min_count:
+        else:
+            # Validate participant count
+            min_count = current.prediction_count or 5
             await callback.answer(
-                f"⛔️ Нельзя опубликовать турнир!\n\nВ турнире всего {current_count} участников, а прогноз требует {min_count} мест. Добавьте еще участников.",
+                f"⛔️ Нельзя опубликовать турнир!\n\nВ турнире всего {current.participants} участников, а прогноз требует {min_count} мест. Добавьте еще участников.",
                 show_alert=True,
             )
-            return
+        return
 
-        tournament.status = TournamentStatus.OPEN
-        await session.commit()
-        await callback.answer(
-            "✅ Турнир опубликован и открыт для прогнозов.", show_alert=True
-        )
+    await callback.answer(
+        "✅ Турнир опубликован и открыт для прогнозов.", show_alert=True
+    )
 
-        # --- Broadcast Notification ---
-        # Run in background. We pass IDs/data, NOT the session.
-        asyncio.create_task(
-            notify_users_about_new_tournament(
-                callback.bot, tournament.id, tournament.name, tournament.date
-            )
+    # --- Broadcast Notification ---
+    # Run in background. We pass IDs/data, NOT the session.
+    spawn_background(
+        notify_users_about_new_tournament(
+            callback.bot, tournament.id, tournament.name, tournament.date
         )
+    )
 
-    await show_tournament_menu(callback, state, tournament_id)
+    await show_tournament_menu(callback, state, tournament_id, tournament)
 
 
 async def notify_users_about_new_tournament(
     bot: Bot, tournament_id: int, tournament_name: str, tournament_date: datetime.date
 ):
     """Helper to broadcast the new tournament notification."""
-    # Create a NEW session for this background task
-    async with async_session() as session:
-        users_res = await session.execute(select(User.id))
-        user_ids = users_res.scalars().all()
+    # Short-lived cache: a re-publish moments later doesn't rescan the users table
+    user_ids = await get_all_user_ids()
 
     if not user_ids:
         return
@@ -1076,7 +1320,7 @@ async def notify_users_about_new_tournament(
     text = (
         f"📢 <b>Новый турнир открыт для прогнозов!</b>\n\n"
         f"🏓 <b>«{tournament_name}»</b>\n"
-        f"📅 Дата: {tournament_date.strftime('%d.%m.%Y')}\n\n"
+        f"📅 Дата: {format_date(tournament_date)}\n\n"
         f"Успейте сделать свой прогноз и побороться за очки! 👇"
     )
 
@@ -1093,76 +1337,90 @@ async def notify_users_about_new_tournament(
     TournamentManagement.managing_tournament, F.data.startswith("tm_close_bets_")
 )
 async def cq_close_bets(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     async with async_session() as session:
-        tournament = await session.get(Tournament, tournament_id)
-        if not tournament:
+        tournament = await _transition_status(
+            session, tournament_id, TournamentStatus.OPEN, TournamentStatus.LIVE
+        )
+        if tournament is not None:
+            await session.commit()
+        else:
+            current_status = await session.scalar(
+                select(Tournament.status).where(Tournament.id == tournament_id)
+            )
+
+    if tournament is None:
+        if current_status is None:
             await callback.answer("⚠️ Турнир не найден.", show_alert=True)
-            return
-        if tournament.status != TournamentStatus.OPEN:
+        else:
             await callback.answer(
-                f"⚠️ Ставки уже закрыты или турнир завершен. Статус: {tournament.status.name}",
+                f"⚠️ Ставки уже закрыты или турнир завершен. Статус: {current_status.name}",
                 show_alert=True,
             )
-            return
-        tournament.status = TournamentStatus.LIVE
-        await session.commit()
-        await callback.answer(
-            "✅ Прием ставок закрыт. Статус изменен на LIVE.", show_alert=True
-        )
+        return
 
-        # Notify forecasters
-        asyncio.create_task(
-            notify_forecasters_status_change(
-                callback.bot, tournament.id, tournament.name, "LIVE"
-            )
-        )
+    await callback.answer(
+        "✅ Прием ставок закрыт. Статус изменен на LIVE.", show_alert=True
+    )
 
-    await show_tournament_menu(callback, state, tournament_id)
+    # Notify forecasters; supersedes a status broadcast still running for this tournament
+    spawn_background(
+        notify_forecasters_status_change(
+            callback.bot, tournament.id, tournament.name, "LIVE"
+        ),
+        key=("status", tournament.id),
+    )
+
+    await show_tournament_menu(callback, state, tournament_id, tournament)
 
 
 @router.callback_query(
     TournamentManagement.managing_tournament, F.data.startswith("tm_open_bets_")
 )
 async def cq_open_bets(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     async with async_session() as session:
-        tournament = await session.get(Tournament, tournament_id)
-        if not tournament:
+        tournament = await _transition_status(
+            session, tournament_id, TournamentStatus.LIVE, TournamentStatus.OPEN
+        )
+        if tournament is not None:
+            await session.commit()
+        else:
+            current_status = await session.scalar(
+                select(Tournament.status).where(Tournament.id == tournament_id)
+            )
+
+    if tournament is None:
+        if current_status is None:
             await callback.answer("⚠️ Турнир не найден.", show_alert=True)
-            return
-        if tournament.status != TournamentStatus.LIVE:
+        else:
             await callback.answer(
-                f"⚠️ Ставки уже открыты или турнир завершен. Статус: {tournament.status.name}",
+                f"⚠️ Ставки уже открыты или турнир завершен. Статус: {current_status.name}",
                 show_alert=True,
             )
-            return
-        tournament.status = TournamentStatus.OPEN
-        await session.commit()
-        await callback.answer(
-            "✅ Прием ставок снова открыт. Статус изменен на OPEN.", show_alert=True
-        )
+        return
 
-        # Notify forecasters
-        asyncio.create_task(
-            notify_forecasters_status_change(
-                callback.bot, tournament.id, tournament.name, "OPEN"
-            )
-        )
+    await callback.answer(
+        "✅ Прием ставок снова открыт. Статус изменен на OPEN.", show_alert=True
+    )
 
-    await show_tournament_menu(callback, state, tournament_id)
+    # Notify forecasters; supersedes a status broadcast still running for this tournament
+    spawn_background(
+        notify_forecasters_status_change(
+            callback.bot, tournament.id, tournament.name, "OPEN"
+        ),
+        key=("status", tournament.id),
+    )
+
+    await show_tournament_menu(callback, state, tournament_id, tournament)
 
 
 async def notify_forecasters_status_change(
     bot: Bot, tournament_id: int, tournament_name: str, new_status: str
 ):
     """Notifies users who predicted on this tournament about status change."""
-    async with async_session() as session:
-        # Get user IDs who made a forecast
-        result = await session.execute(
-            select(Forecast.user_id).where(Forecast.tournament_id == tournament_id)
-        )
-        user_ids = result.scalars().all()
+    # Cached briefly: OPEN/LIVE toggles seconds apart share one query
+    user_ids = await get_forecaster_ids(tournament_id)
 
     if not user_ids:
         return
@@ -1194,7 +1452,7 @@ async def notify_forecasters_status_change(
     TournamentManagement.managing_tournament, F.data.startswith("tm_set_results_start_")
 )
 async def cq_set_results_start(callback: types.CallbackQuery, state: FSMContext):
-    tournament_id = int(callback.data.split("_")[-1])
+    tournament_id = int(callback.data.rpartition("_")[2])
     async with async_session() as session:
         tournament = await session.get(
             Tournament, tournament_id, options=[selectinload(Tournament.participants)]
@@ -1217,10 +1475,7 @@ async def cq_set_results_start(callback: types.CallbackQuery, state: FSMContext)
     await state.set_state(SetResults.entering_results)
     await state.update_data(
         managed_tournament_id=tournament_id,
-        tournament_players={
-            p.id: {"name": p.full_name, "rating": p.current_rating}
-            for p in tournament.participants
-        },
+        **player_columns(tournament.participants),
         results_list=[],
         prediction_count=prediction_count,
     )
@@ -1240,31 +1495,28 @@ async def cq_set_results_start(callback: types.CallbackQuery, state: FSMContext)
 
 @router.callback_query(SetResults.entering_results, F.data.startswith("set_result:"))
 async def cq_process_result_selection(callback: types.CallbackQuery, state: FSMContext):
-    player_id = int(callback.data.split(":")[1])
+    player_id = int(callback.data.partition(":")[2])
     data = await state.get_data()
     results_list = data.get("results_list", [])
     prediction_count = data.get("prediction_count", 5)
 
-    if player_id in results_list:
+    # results_list keeps the order; the set serves the membership test and the keyboard
+    results_set = set(results_list)
+    if player_id in results_set:
         await callback.answer("Этот игрок уже в списке результатов!", show_alert=True)
         return
     results_list.append(player_id)
+    results_set.add(player_id)
     await state.update_data(results_list=results_list)
 
     next_place = len(results_list) + 1
+    # The roster was stored at the start of result entry; no DB reads per click
+    players = player_views(data)
     if next_place <= prediction_count:
-        async with async_session() as session:
-            tournament = await session.get(
-                Tournament,
-                data.get("managed_tournament_id"),
-                options=[selectinload(Tournament.participants)],
-            )
-            players = tournament.participants
-
         kb = get_paginated_players_kb(
             players=players,
             action="set_result",
-            selected_ids=results_list,
+            selected_ids=results_set,
             tournament_id=data.get("managed_tournament_id"),
             show_back_to_menu=True,
             include_inactive=True,
@@ -1275,16 +1527,14 @@ async def cq_process_result_selection(callback: types.CallbackQuery, state: FSMC
         )
     else:
         await state.set_state(SetResults.confirming_results)
-        async with async_session() as session:
-            players = await session.execute(
-                select(Player).where(Player.id.in_(results_list))
-            )
-            players_map = {p.id: p.full_name for p in players.scalars()}
+        players_map = {p.id: p.full_name for p in players}
 
-        final_results_text = "<b>Итоговый список для подтверждения:</b>\n" + "\n".join(
-            f"{i + 1}. {players_map.get(pid, 'Неизвестный')}"
-            for i, pid in enumerate(results_list)
+        lines = ["<b>Итоговый список для подтверждения:</b>"]
+        lines.extend(
+            f"{i}. {players_map.get(pid, 'Неизвестный')}"
+            for i, pid in enumerate(results_list, 1)
         )
+        final_results_text = "\n".join(lines)
         await callback.message.edit_text(
             final_results_text,
             reply_markup=confirmation_kb(action_prefix="confirm_results"),
@@ -1292,6 +1542,114 @@ async def cq_process_result_selection(callback: types.CallbackQuery, state: FSMC
     await callback.answer()
 
 
+_USER_STAT_FIELDS = (
+    "id",
+    "total_points",
+    "accuracy_rate",
+    "avg_error",
+    "total_slots",
+    "tournaments_played",
+    "exact_guesses",
+    "perfect_tournaments",
+)
+
+
+def _score_forecasts(
+    snapshots: list[tuple[int, list[int], dict]], results_dict: dict[int, int]
+) -> tuple[dict[int, int], list[dict]]:
+    """
+    Scores (forecast_id, prediction, user stats) snapshots against the results.
+    Pure CPU work on plain data; returns forecast_id -> points and the user rows to update.
+    """
+    forecast_points = {}
+    user_updates = []
+    # Scoring is pure in (prediction, results): identical picks are scored once
+    scores = {}
+    for forecast_id, prediction, user in snapshots:
+        key = tuple(prediction)
+        score = scores.get(key)
+        if score is None:
+            score = scores[key] = calculate_forecast_points(prediction, results_dict)
+        points, diffs, exact_hits = score
+        forecast_points[forecast_id] = points
+
+        # New logic: using stored total_slots
+        total_slots_before = user["total_slots"] or 0
+
+        # If migrating from old system where total_slots was 0 but forecasts existed:
+        # We can't easily fix it here without re-scanning all history.
+        # Assuming migration script or fresh start handled it or we accept slight inaccuracy for old users.
+
+        new_total, new_acc, new_mae = calculate_new_stats(
+            user["total_points"],
+            user["accuracy_rate"],
+            user["avg_error"],
+            total_slots_before,
+            points,
+            diffs,
+            exact_hits,
+        )
+
+        # Check perfect bonus
+        slots_count = len(prediction)
+        perfect = slots_count > 0 and exact_hits == slots_count
+
+        user_updates.append(
+            {
+                "id": user["id"],
+                "total_points": new_total,
+                "accuracy_rate": new_acc,
+                "avg_error": new_mae,
+                "total_slots": total_slots_before + slots_count,
+                # Update gamification stats
+                "tournaments_played": (user["tournaments_played"] or 0) + 1,
+                "exact_guesses": (user["exact_guesses"] or 0) + exact_hits,
+                "perfect_tournaments": (user["perfect_tournaments"] or 0) + perfect,
+            }
+        )
+    return forecast_points, user_updates
+
+
+# Extra time budget per result message: 5x the send_limiter interval, leaving room for flood-waits
+_RESULTS_SECONDS_PER_MESSAGE = 0.2
+
+
+async def _broadcast_results(
+    bot: Bot,
+    admin_chat_id: int,
+    summary_chunks: list[str],
+    notifications: list[tuple[int, str]],
+):
+    """Sends the admin summary and every forecaster's result message."""
+
+    async def send_summary():
+        # Sequential: the chunks of one ranking must arrive in order
+        try:
+            for chunk in summary_chunks:
+                await bot.send_message(admin_chat_id, chunk)
+        except Exception:
+            # Logged here: gather(return_exceptions=True) would otherwise swallow it
+            logging.exception(f"Failed to send results summary to admin chat {admin_chat_id}")
+
+    # The admin summary goes out alongside the user fan-out, not after it
+    _, *outcomes = await asyncio.gather(
+        send_summary(),
+        *(
+            send_message_safe(bot, user_id, user_message)
+            for user_id, user_message in notifications
+        ),
+        return_exceptions=True,
+    )
+
+    for (user_id, _), outcome in zip(notifications, outcomes):
+        if isinstance(outcome, BaseException):
+            logging.error(
+                f"Failed to send results to user {user_id}", exc_info=outcome
+            )
+    delivered = sum(outcome is True for outcome in outcomes)
+    logging.info(f"Results delivered to {delivered}/{len(notifications)} forecasters")
+
+
 @router.callback_query(SetResults.confirming_results, F.data == "confirm_results:yes")
 async def cq_set_results_confirm(callback: types.CallbackQuery, state: FSMContext):
     data = await state.get_data()
@@ -1308,7 +1666,11 @@ async def cq_set_results_confirm(callback: types.CallbackQuery, state: FSMContex
                 Tournament,
                 tournament_id,
                 options=[
-                    selectinload(Tournament.forecasts).selectinload(Forecast.user)
+                    # selectin, not joined: one extra IN query instead of forecasts x users rows.
+                    # raiseload turns any lazy load in the loops below into an error
+                    selectinload(Tournament.forecasts).options(
+                        selectinload(Forecast.user).raiseload("*"), raiseload("*")
+                    )
                 ],
             )
             if not tournament:
@@ -1318,55 +1680,53 @@ async def cq_set_results_confirm(callback: types.CallbackQuery, state: FSMContex
             tournament.status = TournamentStatus.FINISHED
             tournament.results = results_dict
 
-            # Collect all player IDs from results and all forecasts to fetch names in one query
-            all_player_ids = set(results_dict.keys())
-            for forecast in tournament.forecasts:
-                all_player_ids.update(forecast.prediction_data)
-
-            player_name_map = {}
-            if all_player_ids:
+            # Names for every player in the results or any forecast. The participants'
+            # names are already in FSM state from result entry; only players missing
+            # there (e.g. removed from the roster after forecasting) are fetched
+            all_player_ids = set(results_dict).union(
+                *(f.prediction_data for f in tournament.forecasts)
+            )
+            player_name_map = dict(
+                zip(data.get("player_ids", []), data.get("player_names", []))
+            )
+            missing_ids = all_player_ids.difference(player_name_map)
+            if missing_ids:
                 players_res = await session.execute(
-                    select(Player).where(Player.id.in_(all_player_ids))
+                    select(Player.id, Player.full_name).where(
+                        Player.id.in_(missing_ids)
+                    )
                 )
-                player_name_map = {p.id: p.full_name for p in players_res.scalars()}
-
-            # Process each forecast
-            for forecast in tournament.forecasts:
-                points, diffs, exact_hits = calculate_forecast_points(
-                    forecast.prediction_data, results_dict
+                player_name_map.update(players_res.all())
+
+            # Plain snapshots, so scoring can run in a worker thread while the
+            # event loop keeps serving other updates
+            snapshots = [
+                (
+                    forecast.id,
+                    forecast.prediction_data,
+                    {field: getattr(forecast.user, field) for field in _USER_STAT_FIELDS},
                 )
-                forecast.points_earned = points
-                user = forecast.user
-
-                # New logic: using stored total_slots
-                total_slots_before = user.total_slots or 0
-
-                # If migrating from old system where total_slots was 0 but forecasts existed:
-                # We can't easily fix it here without re-scanning all history.
-                # Assuming migration script or fresh start handled it or we accept slight inaccuracy for old users.
-
-                new_total, new_acc, new_mae = calculate_new_stats(
-                    user.total_points,
-                    user.accuracy_rate,
-                    user.avg_error,
-                    total_slots_before,
-                    points,
-                    diffs,
-                    exact_hits,
+                for forecast in tournament.forecasts
+            ]
+            forecast_points, user_updates = await asyncio.to_thread(
+                _score_forecasts, snapshots, results_dict
+            )
+            for forecast in tournament.forecasts:
+                # Keeps the in-memory value for the messages below without
+                # marking the row dirty; the DB write is the CASE UPDATE
+                set_committed_value(forecast, "points_earned", forecast_points[forecast.id])
+
+            if forecast_points:
+                await session.execute(
+                    update(Forecast)
+                    .where(Forecast.id.in_(forecast_points))
+                    .values(points_earned=case(forecast_points, value=Forecast.id))
+                    .execution_options(synchronize_session=False)
                 )
-                user.total_points = new_total
-                user.accuracy_rate = new_acc
-                user.avg_error = new_mae
-                user.total_slots = total_slots_before + len(forecast.prediction_data)
-
-                # Update gamification stats
-                user.tournaments_played = (user.tournaments_played or 0) + 1
-                user.exact_guesses = (user.exact_guesses or 0) + exact_hits
 
-                # Check perfect bonus
-                slots_count = len(forecast.prediction_data)
-                if slots_count > 0 and exact_hits == slots_count:
-                    user.perfect_tournaments = (user.perfect_tournaments or 0) + 1
+            if user_updates:
+                # ORM bulk UPDATE by primary key: one executemany round trip
+                await session.execute(update(User), user_updates)
 
             await session.commit()
 
@@ -1381,82 +1741,50 @@ async def cq_set_results_confirm(callback: types.CallbackQuery, state: FSMContex
                 final_results_pids, player_name_map
             )
 
-            # Notify users
+            # Notify users: build every message, then send them concurrently;
+            # send_message_safe paces them under the shared Telegram rate limit
+            message_header = (
+                f"<b>Итоги турнира «{tournament.name}» от {format_date(tournament.date)}</b>\n\n"
+                f"{results_text}\n\n"
+            )
+            notifications = []
+            # Many users submit the same top-N: render each distinct prediction once
+            prediction_texts = {}
             for forecast in tournament.forecasts:
-                try:
-                    # Build detailed prediction text with points
-                    prediction_text = f"<b>📜 Ваш прогноз:</b>\n"
-
-                    total_points = forecast.points_earned or 0
-                    # Re-calculate breakdown for display (or we could store it, but calc is cheap)
-                    # We need the diffs/hits logic here locally or helper
-
-                    for i, pid in enumerate(forecast.prediction_data):
-                        predicted_rank = i + 1
-                        p_name = player_name_map.get(pid, "Неизвестный")
-
-                        line_points = 0
-                        extra_info = ""
-
-                        if pid in results_dict:
-                            actual_rank = results_dict[pid]
-                            diff = abs(predicted_rank - actual_rank)
-
-                            if diff == 0:
-                                line_points = 5
-                                extra_info = " (🎯 Точно!)"
-                            else:
-                                line_points = 1
-                                extra_info = f" (факт: {actual_rank})"
-                        else:
-                            line_points = 0
-                            extra_info = " (не в топе)"
-
-                        prediction_text += (
-                            f"{i + 1}. {p_name}{extra_info} — <b>+{line_points}</b>\n"
-                        )
-
-                    # Add logic to show Bonus if perfect
-                    # Re-calculate if bonus applies? Or just check total_points
-                    # Simple check: if total_points == (count * 5) + 15, then bonus applied.
-                    # Or better: check diffs here locally.
-
-                    current_hits = 0
-                    for i, pid in enumerate(forecast.prediction_data):
-                        if pid in results_dict and results_dict[pid] == i + 1:
-                            current_hits += 1
-
-                    if (
-                        current_hits == len(forecast.prediction_data)
-                        and len(forecast.prediction_data) > 0
-                    ):
-                        prediction_text += (
-                            "\n🎉 <b>БОНУС: +15 очков за идеальный прогноз!</b>\n"
+                total_points = forecast.points_earned or 0
+                key = tuple(forecast.prediction_data)
+                prediction_text = prediction_texts.get(key)
+                if prediction_text is None:
+                    prediction_text = prediction_texts[key] = (
+                        build_scored_prediction_text(
+                            forecast.prediction_data, results_dict, player_name_map
                         )
-
-                    user_message = (
-                        f"<b>Итоги турнира «{tournament.name}» от {tournament.date.strftime('%d.%m.%Y')}</b>\n\n"
-                        f"{results_text}\n\n"  # Added an extra newline here
-                        f"{prediction_text}\n"
-                        f"<b>💰 Итого очков: {total_points}</b>"
-                    )
-                    await callback.bot.send_message(forecast.user_id, user_message)
-                    await asyncio.sleep(0.2)
-                except Exception as e:
-                    logging.warning(
-                        f"Failed to send notification to user {forecast.user_id}: {e}"
                     )
 
+                user_message = (
+                    f"{message_header}{prediction_text}\n"
+                    f"<b>💰 Итого очков: {total_points}</b>"
+                )
+                notifications.append((forecast.user_id, user_message))
+
             # Notify admin with ALL forecasters
-            all_forecasters = sorted(
-                tournament.forecasts,
-                key=lambda f: (f.points_earned or 0, -f.id),
-                reverse=True,
+            # Ordered by the DB (ix_forecasts_tournament_results), same as the results table
+            forecasters_res = await session.execute(
+                select(Forecast)
+                .options(joinedload(Forecast.user))
+                .where(Forecast.tournament_id == tournament_id)
+                .order_by(
+                    func.coalesce(Forecast.points_earned, 0).desc(),
+                    Forecast.created_at.asc(),
+                )
             )
+            all_forecasters = forecasters_res.scalars().all()
 
-            admin_summary_text = (
-                f"<b>🏆 Итоги прогнозов турнира «{tournament.name}»:</b>\n\n"
-            )
+            header = f"<b>🏆 Итоги прогнозов турнира «{tournament.name}»:</b>\n\n"
+            # Lines are collected and joined per message to avoid quadratic += copies
+            summary_chunks = []
+            buf = [header]
+            size = len(header)
 
             for i, forecast in enumerate(all_forecasters):
                 place = get_medal_str(i + 1)
@@ -1465,14 +1793,30 @@ async def cq_set_results_confirm(callback: types.CallbackQuery, state: FSMContex
 
                 line = f"{place} {display_name} - <b>{forecast.points_earned or 0}</b> очков\n"
 
-                if len(admin_summary_text) + len(line) > 4000:
-                    await callback.message.answer(admin_summary_text)
-                    admin_summary_text = ""
-
-                admin_summary_text += line
-
-            if admin_summary_text:
-                await callback.message.answer(admin_summary_text)
+                if size + len(line) > 4000:
+                    summary_chunks.append("".join(buf))
+                    buf = []
+                    size = 0
+
+                buf.append(line)
+                size += len(line)
+
+            if buf:
+                summary_chunks.append("".join(buf))
+
+            # Only plain strings go to the background task: the handler returns
+            # to the menu and releases the session without waiting on the fan-out.
+            # The bound grows with the recipient count so a large tournament isn't cut off
+            spawn_background(
+                _broadcast_results(
+                    callback.bot,
+                    callback.message.chat.id,
+                    summary_chunks,
+                    notifications,
+                ),
+                timeout=BACKGROUND_TIMEOUT_SECONDS
+                + len(notifications) * _RESULTS_SECONDS_PER_MESSAGE,
+            )
 
         except Exception as e:
             await session.rollback()
@@ -1,9 +1,19 @@
-from typing import List, Optional, cast
+from collections import namedtuple
+import functools
+from typing import Collection, Iterable, List, Optional, Sequence, cast
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 import math
+from sqlalchemy import Row
 
 from app.db.models import Tournament, Player, Forecast, TournamentStatus
+from app.utils.formatting import format_date
+
+
+# Lightweight stand-in for Player when a keyboard is rebuilt from FSM data
+PlayerView = namedtuple(
+    "PlayerView", "id full_name current_rating is_active", defaults=(None, True)
+)
 
 
 def is_player_active(player: Player) -> bool:
@@ -11,15 +21,38 @@ def is_player_active(player: Player) -> bool:
     return True if active_value is None else active_value
 
 
+def player_columns(players: Iterable[Player]) -> dict:
+    """
+    Packs players into parallel id/name/rating lists for FSM storage.
+    Column lists serialize smaller than a dict of dicts keyed by stringified IDs.
+    """
+    players = list(players)
+    return {
+        "player_ids": [p.id for p in players],
+        "player_names": [p.full_name for p in players],
+        "player_ratings": [p.current_rating for p in players],
+    }
+
+
+def player_views(data: dict) -> List[PlayerView]:
+    """Rebuilds PlayerView objects from the lists produced by player_columns()."""
+    return [
+        PlayerView(*fields)
+        for fields in zip(
+            data["player_ids"], data["player_names"], data["player_ratings"]
+        )
+    ]
+
+
 def tournament_selection_kb(
-    tournaments: List[Tournament], predicted_ids: List[int]
+    tournaments: List[Tournament], predicted_ids: Collection[int]
 ) -> InlineKeyboardMarkup:
     """Creates a keyboard for selecting a tournament."""
     builder = InlineKeyboardBuilder()
     for tournament in tournaments:
         mark = "✅" if tournament.id in predicted_ids else "⬜️"
         builder.button(
-            text=f"{mark} «{tournament.name}» ({tournament.date.strftime('%d.%m.%Y')})",
+            text=f"{mark} «{tournament.name}» ({format_date(tournament.date)})",
             callback_data=f"select_tournament_{tournament.id}",
         )
     builder.adjust(1)
@@ -66,6 +99,9 @@ def tournament_user_menu_kb(
     return builder.as_markup()
 
 
+# Keyboards that depend only on their arguments are built once and shared:
+# markups are never mutated after as_markup(), so reusing the instance is safe.
+@functools.lru_cache(maxsize=None)
 def confirmation_kb(action_prefix: str = "confirm") -> InlineKeyboardMarkup:
     """Creates a keyboard for confirmation with a dynamic prefix."""
     builder = InlineKeyboardBuilder()
@@ -74,48 +110,66 @@ def confirmation_kb(action_prefix: str = "confirm") -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+PLAYERS_PAGE_SIZE = 8
+
+
 def get_paginated_players_kb(
     players: List[Player],
     action: str,
     page: int = 0,
-    page_size: int = 8,
-    selected_ids: Optional[List[int]] = None,
+    page_size: int = PLAYERS_PAGE_SIZE,
+    selected_ids: Optional[Iterable[int]] = None,
     tournament_id: Optional[int] = None,
     show_create_new: bool = False,
     show_back_to_menu: bool = False,
     include_inactive: bool = False,
+    total_players: Optional[int] = None,
+    checked_ids: Optional[Collection[int]] = None,
+    extra_buttons: Sequence[InlineKeyboardButton] = (),
 ) -> InlineKeyboardMarkup:
     """
     Creates a universal paginated keyboard for player selection.
+    When total_players is given, players is the already filtered and sorted page
+    fetched from the DB, and only the navigation is computed here.
+    Players in checked_ids are marked (multi-select); extra_buttons go one per row above "Back".
     """
-    if selected_ids is None:
-        selected_ids = []
-
-    # Modified sorting: Rating desc, then Name asc
-    available_players = sorted(
-        [
-            p
-            for p in players
-            if p.id not in selected_ids and (include_inactive or is_player_active(p))
-        ],
-        key=lambda p: (-(p.current_rating or 0), p.full_name),
-    )
-
     builder = InlineKeyboardBuilder()
-    total_players = len(available_players)
-    total_pages = max(1, math.ceil(total_players / page_size))
-    page = max(0, min(page, total_pages - 1))
 
-    start_index = page * page_size
-    end_index = start_index + page_size
-    page_players = available_players[start_index:end_index]
+    if total_players is None:
+        selected_ids = set(selected_ids) if selected_ids else set()
+
+        # Rating desc with unrated players last, then Name asc (same as the DB queries)
+        available_players = sorted(
+            [
+                p
+                for p in players
+                if p.id not in selected_ids and (include_inactive or is_player_active(p))
+            ],
+            key=lambda p: (
+                p.current_rating is None,
+                -(p.current_rating or 0),
+                p.full_name,
+            ),
+        )
+        total_players = len(available_players)
+        total_pages = max(1, math.ceil(total_players / page_size))
+        page = max(0, min(page, total_pages - 1))
+
+        start_index = page * page_size
+        end_index = start_index + page_size
+        page_players = available_players[start_index:end_index]
+    else:
+        total_pages = max(1, math.ceil(total_players / page_size))
+        page = max(0, min(page, total_pages - 1))
+        page_players = players
 
     for player in page_players:
         rating_str = (
             f"[{player.current_rating}] " if player.current_rating is not None else ""
         )
+        check_str = "✅ " if checked_ids and player.id in checked_ids else ""
         builder.button(
-            text=f"{rating_str}{player.full_name}",
+            text=f"{check_str}{rating_str}{player.full_name}",
             callback_data=f"{action}:{player.id}",
         )
     builder.adjust(2)
@@ -147,6 +201,9 @@ def get_paginated_players_kb(
             )
         )
 
+    for button in extra_buttons:
+        builder.row(button)
+
     if show_back_to_menu and tournament_id:
         back_cb = f"manage_tournament_{tournament_id}"  # Default admin
         if action == "predict":
@@ -157,6 +214,48 @@ def get_paginated_players_kb(
     return builder.as_markup()
 
 
+def add_participants_kb(
+    players: Sequence[Player | Row],
+    tournament_id: int,
+    page: int,
+    total_players: int,
+    checked_ids: Optional[Collection[int]] = None,
+) -> InlineKeyboardMarkup:
+    """
+    Keyboard over one prefetched page of players that can join the tournament.
+    With checked_ids it works as a multi-select ending in a "Done" button.
+    """
+    if checked_ids is None:
+        return get_paginated_players_kb(
+            players=players,
+            action="add_player",
+            page=page,
+            total_players=total_players,
+            tournament_id=tournament_id,
+            show_create_new=True,
+            show_back_to_menu=True,
+            extra_buttons=(
+                InlineKeyboardButton(
+                    text="☑️ Выбрать несколько", callback_data="tm_add_bulk_start"
+                ),
+            ),
+        )
+    return get_paginated_players_kb(
+        players=players,
+        action="add_player_multi",
+        page=page,
+        total_players=total_players,
+        tournament_id=tournament_id,
+        show_back_to_menu=True,
+        checked_ids=checked_ids,
+        extra_buttons=(
+            InlineKeyboardButton(
+                text=f"✅ Готово ({len(checked_ids)})", callback_data="tm_add_confirm"
+            ),
+        ),
+    )
+
+
 def my_forecasts_menu_kb() -> InlineKeyboardMarkup:
     """Creates a keyboard for the 'My Forecasts' menu."""
     builder = InlineKeyboardBuilder()
@@ -177,7 +276,7 @@ def active_tournaments_kb(tournaments: List[Tournament]) -> InlineKeyboardMarkup
         elif tournament_status == TournamentStatus.FINISHED:
             status_icon = "🏁"
 
-        text = f"{status_icon} «{tournament.name}» ({tournament.date.strftime('%d.%m.%Y')})"
+        text = f"{status_icon} «{tournament.name}» ({format_date(tournament.date)})"
         builder.button(text=text, callback_data=f"view_forecast:{tournament.id}")
     builder.adjust(1)
     # Add a back button
@@ -250,7 +349,7 @@ def forecast_history_kb(
     page_forecasts = forecasts[start_index:end_index]
 
     for forecast in page_forecasts:
-        text = f"«{forecast.tournament.name}» ({forecast.tournament.date.strftime('%d.%m.%Y')})"
+        text = f"«{forecast.tournament.name}» ({format_date(forecast.tournament.date)})"
         builder.button(text=text, callback_data=f"view_history:{forecast.id}:{page}")
     builder.adjust(1)
 
@@ -280,6 +379,7 @@ def forecast_history_kb(
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def cancel_fsm_kb() -> InlineKeyboardMarkup:
     """Creates a keyboard with a single 'Cancel' button for FSM processes."""
     builder = InlineKeyboardBuilder()
@@ -287,6 +387,7 @@ def cancel_fsm_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def admin_menu_kb() -> InlineKeyboardMarkup:
     """Main menu for admin tournament management."""
     builder = InlineKeyboardBuilder()
@@ -298,24 +399,36 @@ def admin_menu_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+TOURNAMENTS_PAGE_SIZE = 6
+
+
 def get_paginated_tournaments_kb(
-    tournaments: List[Tournament], status_group: str, page: int = 0, page_size: int = 6
+    tournaments: Sequence[Tournament | Row],
+    status_group: str,
+    page: int = 0,
+    page_size: int = TOURNAMENTS_PAGE_SIZE,
+    total_tournaments: Optional[int] = None,
 ) -> InlineKeyboardMarkup:
     """
     Creates a paginated keyboard for tournaments list.
+    When total_tournaments is given, tournaments is the already fetched page.
     """
     builder = InlineKeyboardBuilder()
-    total_items = len(tournaments)
-    total_pages = max(1, math.ceil(total_items / page_size))
-    page = max(0, min(page, total_pages - 1))
+    if total_tournaments is None:
+        total_pages = max(1, math.ceil(len(tournaments) / page_size))
+        page = max(0, min(page, total_pages - 1))
 
-    start_index = page * page_size
-    end_index = start_index + page_size
-    page_tournaments = tournaments[start_index:end_index]
+        start_index = page * page_size
+        end_index = start_index + page_size
+        page_tournaments = tournaments[start_index:end_index]
+    else:
+        total_pages = max(1, math.ceil(total_tournaments / page_size))
+        page = max(0, min(page, total_pages - 1))
+        page_tournaments = tournaments
 
     for t in page_tournaments:
         builder.button(
-            text=f"«{t.name}» ({t.date.strftime('%d.%m.%Y')}) - {t.status.name}",
+            text=f"«{t.name}» ({format_date(t.date)}) - {t.status.name}",
             callback_data=f"manage_tournament_{t.id}",
         )
     builder.adjust(1)
@@ -345,6 +458,7 @@ def get_paginated_tournaments_kb(
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def enter_rating_fsm_kb() -> InlineKeyboardMarkup:
     """Keyboard for entering a new rating, with a back button."""
     builder = InlineKeyboardBuilder()
@@ -352,6 +466,7 @@ def enter_rating_fsm_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def new_player_rating_kb() -> InlineKeyboardMarkup:
     """Keyboard for new player rating input (Skip option)."""
     builder = InlineKeyboardBuilder()
@@ -627,6 +742,7 @@ def view_participants_back_kb(tournament_id: int, source: str) -> InlineKeyboard
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def help_menu_kb() -> InlineKeyboardMarkup:
     """Keyboard for the help menu."""
     builder = InlineKeyboardBuilder()
@@ -637,6 +753,7 @@ def help_menu_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def help_back_kb() -> InlineKeyboardMarkup:
     """Back button for help sections."""
     builder = InlineKeyboardBuilder()
@@ -644,6 +761,7 @@ def help_back_kb() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=256)
 def add_player_success_kb(tournament_id: int) -> InlineKeyboardMarkup:
     """Keyboard shown after successfully adding a player to a tournament."""
     builder = InlineKeyboardBuilder()
@@ -658,6 +776,7 @@ def add_player_success_kb(tournament_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@functools.lru_cache(maxsize=None)
 def add_global_player_success_kb() -> InlineKeyboardMarkup:
     """Keyboard shown after successfully adding a player to the global database."""
     builder = InlineKeyboardBuilder()
@@ -2,6 +2,7 @@ class LexiconRU:
     NO_OPEN_TOURNAMENTS = "Сейчас нет турниров, открытых для прогнозов, или вы уже сделали прогноз на все доступные. Загляните позже!"
     CHOOSE_TOURNAMENT = "Выберите турнир для создания прогноза:"
     TOURNAMENT_NOT_FOUND = "Турнир не найден."
+    PREDICTIONS_CLOSED = "⚠️ Прием прогнозов на этот турнир закрыт."
     TOURNAMENT_TITLE = "<b>Турнир: «{name}»</b>\nДата: {date}\n\nВыберите действие:"
     PARTICIPANTS_TITLE = "<b>Участники турнира «{name}»</b>\n\n"
     NO_PARTICIPANTS = "В этом турнире пока нет зарегистрированных участников."
@@ -45,6 +46,7 @@ LEXICON_RU = {
     "no_open_tournaments": LexiconRU.NO_OPEN_TOURNAMENTS,
     "choose_tournament": LexiconRU.CHOOSE_TOURNAMENT,
     "tournament_not_found": LexiconRU.TOURNAMENT_NOT_FOUND,
+    "predictions_closed": LexiconRU.PREDICTIONS_CLOSED,
     "tournament_title": LexiconRU.TOURNAMENT_TITLE,
     "participants_title": LexiconRU.PARTICIPANTS_TITLE,
     "no_participants": LexiconRU.NO_PARTICIPANTS,
@@ -13,6 +13,7 @@ class TournamentManagement(StatesGroup):
     adding_participant_rating_options = State()
     adding_participant_entering_rating = State()
     adding_new_participant_rating = State()
+    adding_participants_bulk = State()
     
     removing_participant_choosing_player = State()
 
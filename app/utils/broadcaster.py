@@ -1,54 +1,151 @@
 import asyncio
+import functools
 import logging
-from typing import List, Optional
+from typing import Any, Coroutine, Dict, Hashable, List, Optional, Set
 
 from aiogram import Bot
 from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
 from aiogram.types import InlineKeyboardMarkup
 
+
+class RateLimiter:
+    """
+    Spaces out entries to at most `rate` per second, shared by concurrent tasks.
+
+    Usage: ``async with limiter: await bot.send_message(...)``
+    """
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+# Telegram allows ~30 messages/sec per bot for bulk sends; stay a bit below it.
+# Module-level so every notification path shares the same budget.
+send_limiter = RateLimiter(25)
+
+# Caps requests in flight so a slow API can't pile sends up on the bot's
+# connection pool (see tg_connection_limit); the limiter above only spaces starts.
+send_slots = asyncio.Semaphore(20)
+
+
+# Strong references to fire-and-forget tasks: the loop keeps only weak ones,
+# so an untracked notification task could be garbage-collected mid-flight.
+BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+# Upper bound on a single background job, so a stuck broadcast can't live forever
+BACKGROUND_TIMEOUT_SECONDS = 300.0
+
+# Latest task per coalescing key (e.g. one status broadcast per tournament)
+_keyed_tasks: Dict[Hashable, asyncio.Task] = {}
+
+
+def _forget_task(key: Optional[Hashable], task: asyncio.Task) -> None:
+    BACKGROUND_TASKS.discard(task)
+    if key is not None and _keyed_tasks.get(key) is task:
+        del _keyed_tasks[key]
+    if task.cancelled():
+        return
+    error = task.exception()
+    if isinstance(error, TimeoutError):
+        logging.warning("Background task timed out (key=%s)", key)
+    elif error is not None:
+        logging.error("Background task failed", exc_info=error)
+
+
+async def _run_bounded(coro: Coroutine[Any, Any, Any], timeout: Optional[float]) -> Any:
+    async with asyncio.timeout(timeout):
+        return await coro
+
+
+def spawn_background(
+    coro: Coroutine[Any, Any, Any],
+    key: Optional[Hashable] = None,
+    timeout: Optional[float] = BACKGROUND_TIMEOUT_SECONDS,
+) -> asyncio.Task:
+    """
+    Runs a coroutine off the request path, keeping it alive until it finishes.
+
+    With a key, a still-running task spawned under the same key is cancelled first,
+    so rapid repeats (OPEN -> LIVE -> OPEN) only deliver the latest message.
+    The task is cancelled after `timeout` seconds; None disables the limit.
+    """
+    if key is not None:
+        previous = _keyed_tasks.get(key)
+        if previous is not None and not previous.done():
+            previous.cancel()
+    task = asyncio.create_task(_run_bounded(coro, timeout))
+    BACKGROUND_TASKS.add(task)
+    if key is not None:
+        _keyed_tasks[key] = task
+    task.add_done_callback(functools.partial(_forget_task, key))
+    return task
+
+
+async def send_message_safe(
+    bot: Bot,
+    user_id: int,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+    **kwargs,
+) -> bool:
+    """
+    Sends one rate-limited message, retrying once after a flood-wait.
+
+    :return: True if the message was delivered
+    """
+    async with send_limiter, send_slots:
+        try:
+            await bot.send_message(user_id, text, reply_markup=reply_markup, **kwargs)
+            return True
+        except TelegramForbiddenError:
+            # User blocked the bot
+            logging.debug(f"User {user_id} blocked the bot. Skipping.")
+        except TelegramRetryAfter as e:
+            logging.warning(f"Flood limit exceeded. Sleeping for {e.retry_after} seconds.")
+            await asyncio.sleep(e.retry_after)
+            try:
+                await bot.send_message(user_id, text, reply_markup=reply_markup, **kwargs)
+                return True
+            except Exception as retry_error:
+                logging.warning(f"Failed to send message to {user_id} after retry: {retry_error}")
+        except Exception as e:
+            logging.warning(f"Failed to send message to {user_id}: {e}")
+    return False
+
+
 async def broadcast_message(
     bot: Bot,
     user_ids: List[int],
     text: str,
     reply_markup: Optional[InlineKeyboardMarkup] = None,
-    sleep_time: float = 0.1
 ) -> int:
     """
     Safe broadcaster that respects Telegram limits.
-    
+
+    Sends overlap instead of running one by one: send_limiter spaces them under
+    the global rate and send_slots bounds how many are in flight.
+
     :param bot: Bot instance
     :param user_ids: List of user IDs to send message to
     :param text: Message text
     :param reply_markup: Optional keyboard
-    :param sleep_time: Sleep time between messages (default 0.1s = 10 msgs/sec)
     :return: Count of successfully sent messages
     """
-    count = 0
-    try:
-        for user_id in user_ids:
-            try:
-                await bot.send_message(user_id, text, reply_markup=reply_markup)
-                count += 1
-            except TelegramForbiddenError:
-                # User blocked the bot
-                logging.debug(f"User {user_id} blocked the bot. Skipping.")
-            except TelegramRetryAfter as e:
-                # We hit a limit, sleep for the requested time
-                logging.warning(f"Flood limit exceeded. Sleeping for {e.retry_after} seconds.")
-                await asyncio.sleep(e.retry_after)
-                # Try once more
-                try:
-                    await bot.send_message(user_id, text, reply_markup=reply_markup)
-                    count += 1
-                except Exception:
-                    pass
-            except Exception as e:
-                logging.error(f"Failed to send message to {user_id}: {e}")
-            
-            # Sleep to respect limits (approx 10-20 messages per second safe limit for bulk)
-            await asyncio.sleep(sleep_time)
-            
-    except Exception as e:
-        logging.error(f"Broadcaster critical error: {e}")
-        
-    return count
+    results = await asyncio.gather(
+        *(send_message_safe(bot, user_id, text, reply_markup) for user_id in user_ids),
+        return_exceptions=True,
+    )
+    return sum(1 for delivered in results if delivered is True)
@@ -1,3 +1,5 @@
+import datetime
+import functools
 from html import escape
 from typing import Dict, Iterable, List
 
@@ -5,15 +7,19 @@ from typing import Dict, Iterable, List
 # But typing is good. We can use 'Any' or just expect attributes.
 
 
+@functools.lru_cache(maxsize=1024)
+def format_date(value: datetime.date) -> str:
+    """DD.MM.YYYY, memoized: the same few tournament dates are rendered over and over."""
+    return value.strftime("%d.%m.%Y")
+
+
+# Medals for the first three places, indexed by 0-based position
+PLACE_MEDALS = ("🥇", "🥈", "🥉")
+
+
 def get_medal_str(rank: int) -> str:
     """Returns a medal icon or the rank number formatted."""
-    if rank == 1:
-        return "🥇"
-    if rank == 2:
-        return "🥈"
-    if rank == 3:
-        return "🥉"
-    return f"{rank}."
+    return PLACE_MEDALS[rank - 1] if 1 <= rank <= 3 else f"{rank}."
 
 
 def format_player_list(player_ids: List[int], player_names_map: Dict[int, str]) -> str:
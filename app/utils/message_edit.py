@@ -0,0 +1,48 @@
+import logging
+from typing import Optional
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _shows(message: types.Message, text: str, reply_markup: Optional[InlineKeyboardMarkup]) -> bool:
+    """True when the message already displays this text and keyboard."""
+    try:
+        current_text = message.html_text
+    except (AttributeError, TypeError):
+        return False
+    return current_text == text and message.reply_markup == reply_markup
+
+
+async def safe_edit(
+    callback: types.CallbackQuery,
+    text: str,
+    reply_markup: Optional[InlineKeyboardMarkup] = None,
+) -> None:
+    """
+    Shows text and keyboard in the callback's message.
+
+    Skips the API call when the message already shows the same content, and sends
+    a new message when the old one can't be edited (deleted, too old, inaccessible).
+    The callback itself is left for the caller to answer.
+    """
+    message = callback.message
+    if message is None or isinstance(message, types.InaccessibleMessage):
+        await callback.bot.send_message(callback.from_user.id, text, reply_markup=reply_markup)
+        return
+
+    # The pressed message carries its current content, so no edit is needed to learn it's unchanged
+    if _shows(message, text, reply_markup):
+        return
+
+    try:
+        await message.edit_text(text, reply_markup=reply_markup)
+    except TelegramBadRequest as exc:
+        if "message is not modified" in str(exc).lower():
+            return
+        LOGGER.debug("safe_edit.fallback chat_id=%s error=%s", message.chat.id, exc)
+        await message.answer(text, reply_markup=reply_markup)
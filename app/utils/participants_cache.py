@@ -0,0 +1,46 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.db import crud
+from app.db.models import Player
+from app.db.session import async_session
+from app.keyboards.inline import PlayerView
+
+# Participants don't change while a user picks places, so a short per-process TTL
+# keeps the prediction flow off the DB and the roster out of FSM storage.
+PARTICIPANTS_TTL_SECONDS = 60.0
+
+_participants_cache: Dict[int, Tuple[float, List[PlayerView]]] = {}
+
+
+def remember_participants(
+    tournament_id: int, players: Iterable[Player]
+) -> List[PlayerView]:
+    """Stores already loaded participants in the cache and returns their views."""
+    views = [
+        PlayerView(p.id, p.full_name, p.current_rating, p.is_active) for p in players
+    ]
+    _participants_cache[tournament_id] = (
+        time.monotonic() + PARTICIPANTS_TTL_SECONDS,
+        views,
+    )
+    return views
+
+
+async def get_participants(tournament_id: int) -> List[PlayerView]:
+    """Returns tournament participants, loading them from the DB on a cache miss."""
+    entry = _participants_cache.get(tournament_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+
+    async with async_session() as session:
+        players = await crud.get_tournament_participants(session, tournament_id)
+    return remember_participants(tournament_id, players)
+
+
+def invalidate_participants(tournament_id: Optional[int] = None) -> None:
+    """Drops one tournament from the cache, or everything when no ID is given."""
+    if tournament_id is None:
+        _participants_cache.clear()
+    else:
+        _participants_cache.pop(tournament_id, None)
@@ -0,0 +1,34 @@
+import math
+from typing import Sequence, Tuple
+
+from sqlalchemy import Row
+
+from app.db import crud
+from app.db.session import async_session
+from app.keyboards.inline import PLAYERS_PAGE_SIZE
+
+
+async def get_addable_players_page(
+    tournament_id: int, page: int, page_size: int = PLAYERS_PAGE_SIZE
+) -> Tuple[Sequence[Row], int, int]:
+    """
+    Loads one page of players that can be added to the tournament.
+    Returns (rows, total, page); the page is clamped when the roster shrank.
+    """
+    async with async_session() as session:
+        # Rows carry the total, so a filled page costs a single round trip
+        rows = await crud.get_addable_players_page(
+            session, tournament_id, page * page_size, page_size
+        )
+        if rows:
+            return rows, rows[0].total, page
+
+        total = await crud.count_addable_players(session, tournament_id)
+        last_page = max(0, math.ceil(total / page_size) - 1)
+        if page > last_page:
+            # The last player of the last page was just added: step back
+            page = last_page
+            rows = await crud.get_addable_players_page(
+                session, tournament_id, page * page_size, page_size
+            )
+    return rows, total, page
@@ -0,0 +1,64 @@
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.db.models import Forecast, User
+from app.db.session import async_session
+
+# Broadcast recipient lists are re-read on every publish and OPEN/LIVE toggle; a short
+# per-process TTL lets toggles seconds apart share one scan. New forecasts invalidate
+# their tournament's entry explicitly; a user who registers within the TTL may miss
+# one broadcast, which is acceptable for announcements.
+RECIPIENTS_TTL_SECONDS = 60.0
+
+_ALL_USERS = "all_users"
+
+_recipients_cache: Dict[Hashable, Tuple[float, List[int]]] = {}
+
+
+def _cached(key: Hashable) -> Optional[List[int]]:
+    entry = _recipients_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _remember(key: Hashable, user_ids: List[int]) -> List[int]:
+    _recipients_cache[key] = (time.monotonic() + RECIPIENTS_TTL_SECONDS, user_ids)
+    return user_ids
+
+
+async def get_all_user_ids() -> List[int]:
+    """Returns the IDs of all users, loading them from the DB on a cache miss."""
+    user_ids = _cached(_ALL_USERS)
+    if user_ids is None:
+        async with async_session() as session:
+            user_ids = list(await session.scalars(select(User.id)))
+        _remember(_ALL_USERS, user_ids)
+    return user_ids
+
+
+async def get_forecaster_ids(tournament_id: int) -> List[int]:
+    """Returns the distinct IDs of users with a forecast for the tournament."""
+    key = ("forecasters", tournament_id)
+    user_ids = _cached(key)
+    if user_ids is None:
+        async with async_session() as session:
+            user_ids = list(
+                await session.scalars(
+                    select(Forecast.user_id)
+                    .where(Forecast.tournament_id == tournament_id)
+                    .distinct()
+                )
+            )
+        _remember(key, user_ids)
+    return user_ids
+
+
+def invalidate_forecasters(tournament_id: Optional[int] = None) -> None:
+    """Drops one tournament's forecaster list, or every cached list when no ID is given."""
+    if tournament_id is None:
+        _recipients_cache.clear()
+    else:
+        _recipients_cache.pop(("forecasters", tournament_id), None)
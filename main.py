@@ -36,19 +36,24 @@ async def main():
     Главная функция, запускающая бота
     """
     # Инициализация бота
+    # Одна долгоживущая aiohttp-сессия на весь процесс: все запросы к Telegram
+    # переиспользуют keep-alive соединения из её пула
     if config.tg_api_server:
         server = TelegramAPIServer.from_base(config.tg_api_server)
-        session = AiohttpSession(api=server)
-        bot = Bot(
-            token=config.bot_token,
-            session=session,
-            default=DefaultBotProperties(parse_mode="HTML"),
-        )
+        session = AiohttpSession(api=server, limit=config.tg_connection_limit)
         logging.info(f"Using custom Telegram API server: {config.tg_api_server}")
     else:
-        bot = Bot(
-            token=config.bot_token, default=DefaultBotProperties(parse_mode="HTML")
-        )
+        session = AiohttpSession(limit=config.tg_connection_limit)
+    bot = Bot(
+        token=config.bot_token,
+        session=session,
+        default=DefaultBotProperties(parse_mode="HTML"),
+    )
+    logging.info(
+        "Bot HTTP session %#x, connection limit %d",
+        id(session),
+        config.tg_connection_limit,
+    )
 
     # Инициализация Redis для FSM (с безопасным fallback)
     try:
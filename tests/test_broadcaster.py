@@ -0,0 +1,77 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.utils import broadcaster
+
+
+class SpawnBackgroundTests(unittest.IsolatedAsyncioTestCase):
+    async def test_task_is_tracked_until_it_finishes(self):
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+            return "done"
+
+        task = broadcaster.spawn_background(job())
+        self.assertIn(task, broadcaster.BACKGROUND_TASKS)
+
+        release.set()
+        self.assertEqual(await task, "done")
+        await asyncio.sleep(0)  # let the done callback run
+
+        self.assertNotIn(task, broadcaster.BACKGROUND_TASKS)
+
+    async def test_failed_task_is_logged_and_released(self):
+        async def job():
+            raise RuntimeError("boom")
+
+        with self.assertLogs(level="ERROR"):
+            task = broadcaster.spawn_background(job())
+            with self.assertRaises(RuntimeError):
+                await task
+            await asyncio.sleep(0)
+
+        self.assertNotIn(task, broadcaster.BACKGROUND_TASKS)
+
+    async def test_same_key_cancels_the_running_task(self):
+        async def job():
+            await asyncio.sleep(10)
+
+        first = broadcaster.spawn_background(job(), key=("status", 1))
+        second = broadcaster.spawn_background(job(), key=("status", 1))
+
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        self.assertFalse(second.done())
+
+        second.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await second
+        await asyncio.sleep(0)
+
+        self.assertNotIn(("status", 1), broadcaster._keyed_tasks)
+
+    async def test_task_is_cancelled_after_timeout(self):
+        async def job():
+            await asyncio.sleep(10)
+
+        with self.assertLogs(level="WARNING"):
+            task = broadcaster.spawn_background(job(), timeout=0.01)
+            with self.assertRaises(TimeoutError):
+                await task
+            await asyncio.sleep(0)
+
+        self.assertNotIn(task, broadcaster.BACKGROUND_TASKS)
+
+
+class BroadcastMessageTests(unittest.IsolatedAsyncioTestCase):
+    async def test_counts_only_delivered_messages(self):
+        bot = AsyncMock()
+        bot.send_message = AsyncMock(side_effect=[None, RuntimeError("down"), None])
+
+        with patch.object(broadcaster, "send_limiter", broadcaster.RateLimiter(1000)):
+            sent = await broadcaster.broadcast_message(bot, [1, 2, 3], "hello")
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(bot.send_message.await_count, 3)
@@ -1,7 +1,16 @@
+import datetime
 import unittest
 
-from app.db.models import Player
-from app.keyboards.inline import get_paginated_players_kb, is_player_active
+from app.db.models import Player, Tournament, TournamentStatus
+from app.keyboards.inline import (
+    PlayerView,
+    add_participants_kb,
+    get_paginated_players_kb,
+    get_paginated_tournaments_kb,
+    is_player_active,
+    player_columns,
+    player_views,
+)
 
 
 class InlineKeyboardTests(unittest.TestCase):
@@ -48,3 +57,82 @@ class InlineKeyboardTests(unittest.TestCase):
 
         self.assertIn("[100] Active", texts)
         self.assertIn("[200] Archived", texts)
+
+    def test_player_columns_round_trip_into_keyboard(self):
+        columns = player_columns(
+            [
+                Player(id=1, full_name="Alpha", current_rating=100),
+                Player(id=2, full_name="Beta", current_rating=None),
+            ]
+        )
+
+        keyboard = get_paginated_players_kb(
+            players=player_views(columns),
+            action="predict",
+            selected_ids={1},
+        )
+
+        texts = [button.text for row in keyboard.inline_keyboard for button in row]
+
+        self.assertEqual(
+            columns,
+            {
+                "player_ids": [1, 2],
+                "player_names": ["Alpha", "Beta"],
+                "player_ratings": [100, None],
+            },
+        )
+        self.assertEqual(texts, ["Beta"])
+
+    def test_prefetched_page_renders_as_is_with_navigation(self):
+        keyboard = get_paginated_players_kb(
+            players=[PlayerView(5, "Echo", None), PlayerView(6, "Foxtrot", 300)],
+            action="add_player",
+            page=1,
+            page_size=2,
+            total_players=5,
+        )
+
+        texts = [button.text for row in keyboard.inline_keyboard for button in row]
+
+        self.assertEqual(texts, ["Echo", "[300] Foxtrot", "◀️", "2/3", "▶️"])
+
+    def test_prefetched_tournaments_page_renders_as_is_with_navigation(self):
+        keyboard = get_paginated_tournaments_kb(
+            tournaments=[
+                Tournament(
+                    id=7,
+                    name="Cup",
+                    date=datetime.date(2025, 3, 1),
+                    status=TournamentStatus.FINISHED,
+                )
+            ],
+            status_group="finished",
+            page=2,
+            page_size=2,
+            total_tournaments=5,
+        )
+
+        texts = [button.text for row in keyboard.inline_keyboard for button in row]
+
+        self.assertEqual(
+            texts, ["«Cup» (01.03.2025) - FINISHED", "◀️", "3/3", "◀️ Назад"]
+        )
+
+    def test_add_participants_kb_multi_select_marks_checked_players(self):
+        keyboard = add_participants_kb(
+            players=[PlayerView(1, "Alpha", 200), PlayerView(2, "Beta", None)],
+            tournament_id=9,
+            page=0,
+            total_players=2,
+            checked_ids={2},
+        )
+
+        buttons = [button for row in keyboard.inline_keyboard for button in row]
+
+        self.assertEqual(
+            [button.text for button in buttons],
+            ["[200] Alpha", "✅ Beta", "✅ Готово (1)", "◀️ Назад"],
+        )
+        self.assertEqual(buttons[1].callback_data, "add_player_multi:2")
+        self.assertEqual(buttons[2].callback_data, "tm_add_confirm")
@@ -0,0 +1,60 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.utils.message_edit import safe_edit
+
+
+def _markup(label: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text=label, callback_data=label)]]
+    )
+
+
+def _callback(text: str, markup: InlineKeyboardMarkup, **edit_kwargs):
+    message = SimpleNamespace(
+        html_text=text,
+        reply_markup=markup,
+        chat=SimpleNamespace(id=1),
+        edit_text=AsyncMock(**edit_kwargs),
+        answer=AsyncMock(),
+    )
+    return SimpleNamespace(message=message)
+
+
+class SafeEditTests(unittest.IsolatedAsyncioTestCase):
+    async def test_unchanged_content_skips_the_edit(self):
+        callback = _callback("<b>Menu</b>", _markup("a"))
+
+        await safe_edit(callback, "<b>Menu</b>", _markup("a"))
+
+        callback.message.edit_text.assert_not_awaited()
+        callback.message.answer.assert_not_awaited()
+
+    async def test_changed_keyboard_is_edited_in_place(self):
+        callback = _callback("<b>Menu</b>", _markup("a"))
+
+        await safe_edit(callback, "<b>Menu</b>", _markup("b"))
+
+        callback.message.edit_text.assert_awaited_once_with(
+            "<b>Menu</b>", reply_markup=_markup("b")
+        )
+        callback.message.answer.assert_not_awaited()
+
+    async def test_uneditable_message_falls_back_to_a_new_one(self):
+        callback = _callback(
+            "old",
+            None,
+            side_effect=TelegramBadRequest(
+                method=Mock(), message="Bad Request: message to edit not found"
+            ),
+        )
+
+        await safe_edit(callback, "new", _markup("a"))
+
+        callback.message.answer.assert_awaited_once_with(
+            "new", reply_markup=_markup("a")
+        )
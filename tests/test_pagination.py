@@ -0,0 +1,47 @@
+import unittest
+from types import SimpleNamespace
+from typing import cast
+from unittest.mock import AsyncMock, patch
+
+from aiogram import types
+
+from app.handlers import pagination
+from app.keyboards.inline import PlayerView
+
+
+class PaginatePlayersTests(unittest.IsolatedAsyncioTestCase):
+    async def test_prediction_page_ignores_admin_roster_left_in_state(self):
+        participants = [
+            PlayerView(i, f"Participant {i}", 100 - i) for i in range(1, 13)
+        ]
+        state = SimpleNamespace(
+            get_data=AsyncMock(
+                return_value={
+                    "tournament_id": 7,
+                    "forecast_list": [],
+                    # Left behind by the remove-participant flow of another tournament
+                    "managed_tournament_id": 3,
+                    "player_ids": [901, 902],
+                    "player_names": ["Admin Only A", "Admin Only B"],
+                    "player_ratings": [50, 40],
+                }
+            )
+        )
+        callback = SimpleNamespace(
+            data="paginate:predict_7:1",
+            answer=AsyncMock(),
+            message=SimpleNamespace(edit_reply_markup=AsyncMock()),
+        )
+
+        with patch.object(
+            pagination, "get_participants", AsyncMock(return_value=participants)
+        ) as get_participants:
+            await pagination.cq_paginate_players(
+                cast(types.CallbackQuery, callback), state
+            )
+
+        get_participants.assert_awaited_once_with(7)
+        kb = callback.message.edit_reply_markup.await_args.kwargs["reply_markup"]
+        texts = [button.text for row in kb.inline_keyboard for button in row]
+        self.assertTrue(any("Participant" in text for text in texts))
+        self.assertFalse(any("Admin Only" in text for text in texts))
@@ -5,6 +5,7 @@ from app.db.models import TournamentStatus
 from app.handlers.render_helpers import (
     build_forecast_card_text,
     build_history_details_text,
+    build_scored_prediction_text,
     get_forecast_view_flags,
 )
 
@@ -80,3 +81,15 @@ class RenderHelpersTests(unittest.TestCase):
         self.assertIn("(🎯 Точно!)", text)
         self.assertIn("БОНУС: +15 очков за идеальный прогноз", text)
         self.assertIn("<b>💰 Итого очков:</b> 25", text)
+
+    def test_build_scored_prediction_text_scores_each_line(self):
+        text = build_scored_prediction_text(
+            pred_ids=[1, 2, 3],
+            results={1: 1, 2: 3},
+            player_name_map={1: "A", 2: "B"},
+        )
+
+        self.assertIn("1. A (🎯 Точно!) — <b>+5</b>", text)
+        self.assertIn("2. B (факт: 3) — <b>+1</b>", text)
+        self.assertIn("3. Неизвестный (не в топе) — <b>+0</b>", text)
+        self.assertNotIn("БОНУС", text)